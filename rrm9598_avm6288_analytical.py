@@ -0,0 +1,128 @@
+# -------------------------------------------------------------
+# Title   : Vector Processor - Analytical Timing Model
+# Authors : Rugved Mhatre (rrm9598), Akshath Mahajan (avm6288)
+# -------------------------------------------------------------
+
+# Estimates the total cycles of a resolved code flow in one pass, without ticking cycles. Each instruction is decoded
+# by the timing simulator's Core.decode (same FU and cycles), and its dispatch, issue and completion cycles follow from
+# those of the older instructions - list scheduling with the timing model's rules:
+#   - one instruction dispatched per cycle, in order, into its dispatch queue, and only while the queue has room
+#   - each queue issues in order, at most one instruction per cycle, when the FU is free
+#   - an instruction issues only once every older instruction sharing one of its registers has completed
+#   - wait instructions (HALT/CVM/MTCL) complete after the older vector instructions, and nothing younger issues before
+# The estimate ignores the cycle-level ordering effects of the detailed model (e.g. which queue is checked first),
+# --calibrate reports how far off it is on the test cases.
+
+import os
+import io
+import sys
+import time
+import argparse
+import contextlib
+from collections import deque
+
+from rrm9598_avm6288_trace import read_resolved, read_trace
+from rrm9598_avm6288_timingsimulator import Config, Core, StreamIMEM, FU_SCALAR
+
+def estimate_cycles(records, config: Config):
+    # Estimated total cycles of the resolved code records under config
+    decoder = Core(StreamIMEM([]), None, None, config)
+    queue_depths = {queue.name: queue.max_length for queue in [decoder.VDQ, decoder.VCQ, decoder.SCQ]}
+    queue_issues = {name: deque() for name in queue_depths} # issue cycles of the last `depth` instructions of each queue
+    fu_free = [0] * len(decoder.FUs) # cycle each FU takes its next instruction
+    register_free = {} # packed register operand : completion cycle of its last user
+    vector_done = 0 # completion cycle of the last vector instruction
+    wait_done = 0 # completion cycle of the last wait instruction
+    dispatched = 0 # dispatch cycle of the previous instruction
+    last = 0
+
+    for idx, record in enumerate(records):
+        instr = decoder.decode(record, idx)
+        queue = decoder.dispatch_queues[instr.fu].name
+        issues = queue_issues[queue]
+
+        # Dispatch - in order, one per cycle after fetch, once the queue has room
+        dispatch = dispatched + 1 if idx else 2
+        if len(issues) == queue_depths[queue]:
+            dispatch = max(dispatch, issues[0])
+        dispatched = dispatch
+
+        # Issue - in queue order, FU free, no older user of the registers in flight, no older wait instruction
+        issue = max(dispatch, issues[-1] + 1 if issues else 0, fu_free[instr.fu], wait_done)
+        for operand in instr.operands:
+            issue = max(issue, register_free.get(operand, 0))
+        issues.append(issue)
+        if len(issues) > queue_depths[queue]:
+            issues.popleft()
+
+        if instr.wait:
+            # Counts down only once the older vector instructions are done
+            done = max(issue, vector_done) + instr.cycles
+            wait_done = done
+        else:
+            done = issue + instr.cycles
+            if instr.fu != FU_SCALAR:
+                vector_done = max(vector_done, done)
+        fu_free[instr.fu] = done
+        for operand in instr.operands:
+            register_free[operand] = max(register_free.get(operand, 0), done)
+        last = max(last, done)
+        if record[0] == "HALT":
+            break
+    return last
+
+def detailed_cycles(records, config: Config, engine = "event"):
+    vcore = Core(StreamIMEM(records), None, None, config, engine)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vcore.run()
+    return vcore.cycle
+
+def calibrate(testdir):
+    # Analytical vs detailed cycles on every test case with a resolved code flow
+    print("{:<26}{:>12}{:>12}{:>9}{:>14}{:>16}".format("Test", "Detailed", "Analytical", "Error", "Detailed(s)", "Analytical(s)"))
+    print("-" * 89)
+    errors = []
+    for name in sorted(os.listdir(testdir)):
+        tracepath = os.path.join(testdir, name, "Resolved_Code.txt")
+        if not os.path.isfile(tracepath):
+            continue
+        with contextlib.redirect_stdout(io.StringIO()):
+            config = Config(os.path.join(testdir, name))
+        records = list(read_resolved(tracepath))
+        start = time.perf_counter()
+        detailed = detailed_cycles(records, config)
+        detailed_time = time.perf_counter() - start
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytical = estimate_cycles(records, config)
+        analytical_time = time.perf_counter() - start
+        error = (analytical - detailed) / detailed
+        errors.append(abs(error))
+        print("{:<26}{:>12}{:>12}{:>8.1f}%{:>14.3f}{:>16.3f}".format(name, detailed, analytical, 100 * error, detailed_time, analytical_time))
+    print("-" * 89)
+    if errors:
+        print("Mean absolute error: {:.1f}%, max: {:.1f}%".format(100 * sum(errors) / len(errors), 100 * max(errors)))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Vector Core Analytical Timing Model')
+    parser.add_argument('--iodir', default="", type=str, help='Path to the folder containing Config.txt and the resolved code')
+    parser.add_argument('--tracein', default="text", choices=["text", "binary"], help='Load the resolved code flow from text (Resolved_Code.txt) or a binary trace (Resolved_Code.bin)')
+    parser.add_argument('--calibrate', default=None, type=str, nargs='?', const=os.path.join(os.path.dirname(os.path.abspath(__file__)), "test_cases"), help='Compare the estimate against the detailed timing model on every test case in this folder (default: test_cases)')
+    args = parser.parse_args()
+
+    if args.calibrate is not None:
+        calibrate(os.path.abspath(args.calibrate))
+        sys.exit(0)
+
+    iodir = os.path.abspath(args.iodir)
+    print("IO Directory:", iodir)
+    config = Config(iodir)
+    if args.tracein == "binary":
+        records = read_trace(os.path.join(iodir, "Resolved_Code.bin"))
+    else:
+        records = read_resolved(os.path.join(iodir, "Resolved_Code.txt"))
+    print("------------------------------")
+    print(" Estimated Total Cycles: ", estimate_cycles(records, config))
+    print("------------------------------")
+
+    # THE END
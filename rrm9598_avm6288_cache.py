@@ -0,0 +1,105 @@
+# -------------------------------------------------------------
+# Title   : Vector Processor - Input Cache
+# Authors : Rugved Mhatre (rrm9598), Akshath Mahajan (avm6288)
+# -------------------------------------------------------------
+
+# On-disk cache of parsed simulator inputs, kept in <iodir>/.simcache:
+#     <name>-<key>.bin   : data memory image - raw little-endian 32-bit words, as loaded by DMEM.load_image
+#     <name>-<key>.trace : resolved code - binary trace, see rrm9598_avm6288_trace
+#     <name>-<key>.pkl   : any other parsed input (e.g. the program tokens of Code.asm), pickled
+# The key is a hash of the contents of the source files the entry was parsed from, so an entry is never used once a
+# source changes. Storing an entry removes the older entries of the same name.
+
+import os
+import sys
+import glob
+import pickle
+import hashlib
+from array import array
+
+from rrm9598_avm6288_trace import TRACE_VERSION, TraceWriter, read_trace
+
+CACHE_DIR = ".simcache"
+# Bump when the format of any entry changes
+CACHE_VERSION = 1
+
+class SimCache(object):
+    def __init__(self, iodir):
+        self.dirpath = os.path.abspath(os.path.join(iodir, CACHE_DIR))
+        self.keys = {} # source paths : key, each source is hashed once per run
+
+    def key(self, sources: list):
+        sources = tuple(sources)
+        if sources not in self.keys:
+            digest = hashlib.sha256("{}.{}".format(CACHE_VERSION, TRACE_VERSION).encode())
+            for source in sources:
+                digest.update(os.path.basename(source).encode() + b"\0")
+                with open(source, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1 << 20), b""):
+                        digest.update(chunk)
+                digest.update(b"\0")
+            self.keys[sources] = digest.hexdigest()[:32]
+        return self.keys[sources]
+
+    def path(self, name: str, sources: list, ext: str):
+        return os.path.join(self.dirpath, "{}-{}{}".format(name, self.key(sources), ext))
+
+    def lookup(self, name: str, sources: list, ext: str):
+        # Path of the entry, None if it is not cached
+        path = self.path(name, sources, ext)
+        return path if os.path.isfile(path) else None
+
+    def commit(self, name: str, path: str, tmppath: str):
+        # Moves the written entry in place, and drops the stale entries of the same name
+        os.replace(tmppath, path)
+        for stale in glob.glob(os.path.join(self.dirpath, glob.escape(name) + "-*")):
+            if stale != path and not stale.endswith(".tmp"):
+                os.remove(stale)
+
+    def store_words(self, name: str, sources: list, data: array):
+        os.makedirs(self.dirpath, exist_ok=True)
+        path = self.path(name, sources, ".bin")
+        if sys.byteorder == 'big':
+            data = array('i', data)
+            data.byteswap()
+        with open(path + ".tmp", 'wb') as f:
+            data.tofile(f)
+        self.commit(name, path, path + ".tmp")
+
+    def load(self, name: str, sources: list):
+        # Cached object, None if it is not cached
+        path = self.lookup(name, sources, ".pkl")
+        if path is None:
+            return None
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def store(self, name: str, sources: list, obj):
+        os.makedirs(self.dirpath, exist_ok=True)
+        path = self.path(name, sources, ".pkl")
+        with open(path + ".tmp", 'wb') as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        self.commit(name, path, path + ".tmp")
+
+    def records(self, name: str, sources: list, parse):
+        # Generator over resolved code records - streamed from the cached trace, or from parse() while the trace is
+        # written. The entry is committed only if the records are read to the end.
+        path = self.lookup(name, sources, ".trace")
+        if path is not None:
+            yield from read_trace(path)
+            return
+        os.makedirs(self.dirpath, exist_ok=True)
+        path = self.path(name, sources, ".trace")
+        writer = TraceWriter(path + ".tmp")
+        complete = False
+        try:
+            for record in parse():
+                writer.write(record)
+                yield record
+            complete = True
+        finally:
+            writer.close()
+            if complete:
+                self.commit(name, path, path + ".tmp")
+            else:
+                os.remove(path + ".tmp")
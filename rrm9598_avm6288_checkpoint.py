@@ -0,0 +1,278 @@
+# -------------------------------------------------------------
+# Title   : Vector Processor - Architectural Checkpoints
+# Authors : Rugved Mhatre (rrm9598), Akshath Mahajan (avm6288)
+# -------------------------------------------------------------
+
+# Architectural state of the functional simulator after a number of dynamic instructions, as written by
+# Core.save_checkpoint and read by Core.restore_checkpoint. In memory the state is a dictionary:
+#     count, pc    : dynamic instructions executed, program counter of the next instruction
+#     digest       : hash of the input files (Code.asm, memory images) - a checkpoint only applies to the same inputs
+#     VL, VM       : vector length and vector mask register values
+#     SRF, VRF     : register values, one list of words per register
+#     memories     : {"SDMEM": runs, "VDMEM": runs} - runs are (start address, words) of the memory written since it
+#                    was loaded, so only the difference to the input image is stored
+#     trace        : resolved code records so far
+#
+# Binary layout (little-endian):
+#     header  : b"VCKP" + format version (uint8)
+#     state   : count (uint64), pc (uint32), digest (32 bytes), VL (int32), VM (int128)
+#     regs    : SRF then VRF - register count (uint16), words per register (uint16), int32 words
+#     memory  : SDMEM then VDMEM - run count (uint32), each run start (uint32), length (uint32), int32 words
+#     trace   : record count (uint64), records encoded as in Resolved_Code.bin
+#
+# Microarchitectural state of the timing simulator at the end of a cycle, as written by its Core.save_checkpoint and read
+# by Core.restore_checkpoint. In memory the state is a dictionary:
+#     cycle, VL    : cycle counter, vector length register value
+#     halt         : (IF_HALT, ID_HALT, EX_HALT)
+#     busy         : FU, SRF and VRF busy board masks
+#     fetch        : (next fetch index, record fetched and waiting for decode or None, dispatch_success)
+#     trace        : (count, digest) - hash of the first `count` resolved code records, the ones before the fetched one
+#     queues       : VDQ, VCQ, SCQ - (in-flight instructions, (cycles, occupancy, full cycles, peak))
+#     FUs          : per FU - (in-flight instruction or None, remaining cycles)
+#     diagram      : (instr_idx of the oldest row, retired flag of each row, peak rows)
+#     config       : {parameter name: value} of the Config.txt the checkpoint was taken with
+# In-flight instructions are (word, fu, cycles, operands, idx), operands being packed register operands.
+#
+# Binary layout (little-endian):
+#     header  : b"VTCK" + format version (uint8)
+#     state   : cycle (uint64), VL (int32), HALT flags (uint8, bit 0 IF, 1 ID, 2 EX), FU, SRF, VRF busy masks (uint32)
+#     fetch   : next fetch index (uint64), flags (uint8, bit 0 record present, bit 1 dispatch_success), record encoded as
+#               in Resolved_Code.bin
+#     trace   : record count (uint64), digest (32 bytes)
+#     queues  : VDQ, VCQ, SCQ - cycles, occupancy, full cycles (uint64), peak (uint32), instruction count (uint16),
+#               instructions
+#     FUs     : FU count (uint8), per FU - instruction present (uint8), remaining cycles (int32), instruction
+#     instr   : idx (uint64), fu (uint8), cycles (int32), word length (uint8), ascii word, operand count (uint8), int16 operands
+#     diagram : oldest row (uint64), peak (uint32), row count (uint32), retired flags (uint8 each)
+#     config  : parameter count (uint16), each name length (uint8), utf-8 name, value (int64)
+
+import sys
+import struct
+import hashlib
+from array import array
+
+from rrm9598_avm6288_trace import encode_record, decode_record
+
+CHECKPOINT_MAGIC = b"VCKP"
+CHECKPOINT_VERSION = 1
+
+HEADER = struct.Struct("<4sB")
+STATE = struct.Struct("<QI32si16s")
+REGS = struct.Struct("<HH")
+UINT32 = struct.Struct("<I")
+RUN = struct.Struct("<II")
+UINT64 = struct.Struct("<Q")
+
+MEMORIES = ["SDMEM", "VDMEM"]
+
+TIMING_CHECKPOINT_MAGIC = b"VTCK"
+TIMING_CHECKPOINT_VERSION = 2
+
+TIMING_STATE = struct.Struct("<QiBIII")
+FETCH = struct.Struct("<QB")
+TRACE = struct.Struct("<Q32s")
+QUEUE = struct.Struct("<QQQIH")
+FU_STATE = struct.Struct("<Bi")
+INSTR = struct.Struct("<QBiB")
+DIAGRAM = struct.Struct("<QII")
+UINT16 = struct.Struct("<H")
+UINT8 = struct.Struct("<B")
+INT64 = struct.Struct("<q")
+
+def input_digest(paths: list):
+    # Hash of the contents of the input files
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        digest.update(b"\0")
+    return digest.digest()
+
+def memory_runs(data: array, touched):
+    # (start address, words) of the contiguous runs of touched addresses
+    runs = []
+    start = end = None
+    for idx in sorted(touched):
+        if idx != end:
+            if start is not None:
+                runs.append((start, data[start:end]))
+            start = idx
+        end = idx + 1
+    if start is not None:
+        runs.append((start, data[start:end]))
+    return runs
+
+def words_bytes(words):
+    words = array('i', words)
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return words.tobytes()
+
+def bytes_words(buffer, offset: int, count: int):
+    words = array('i')
+    words.frombytes(buffer[offset:offset + 4 * count])
+    if sys.byteorder == 'big':
+        words.byteswap()
+    return words
+
+def write_checkpoint(filepath, state: dict):
+    with open(filepath, 'wb') as f:
+        f.write(HEADER.pack(CHECKPOINT_MAGIC, CHECKPOINT_VERSION))
+        f.write(STATE.pack(state["count"], state["pc"], state["digest"], state["VL"], state["VM"].to_bytes(16, 'little', signed=True)))
+        for name in ["SRF", "VRF"]:
+            registers = state[name]
+            f.write(REGS.pack(len(registers), len(registers[0]) if registers else 0))
+            for register in registers:
+                f.write(words_bytes(register))
+        for name in MEMORIES:
+            runs = state["memories"][name]
+            f.write(UINT32.pack(len(runs)))
+            for start, words in runs:
+                f.write(RUN.pack(start, len(words)))
+                f.write(words_bytes(words))
+        f.write(UINT64.pack(len(state["trace"])))
+        f.write(b"".join([encode_record(record) for record in state["trace"]]))
+
+def read_checkpoint(filepath):
+    with open(filepath, 'rb') as f:
+        buffer = f.read()
+    if len(buffer) < HEADER.size or HEADER.unpack_from(buffer, 0) != (CHECKPOINT_MAGIC, CHECKPOINT_VERSION):
+        raise ValueError("Not a checkpoint (or unsupported version): " + filepath)
+    offset = HEADER.size
+    count, pc, digest, vl, vm = STATE.unpack_from(buffer, offset)
+    offset += STATE.size
+    state = {"count": count, "pc": pc, "digest": digest, "VL": vl, "VM": int.from_bytes(vm, 'little', signed=True), "memories": {}}
+
+    for name in ["SRF", "VRF"]:
+        reg_count, length = REGS.unpack_from(buffer, offset)
+        offset += REGS.size
+        registers = []
+        for _ in range(reg_count):
+            registers.append(bytes_words(buffer, offset, length).tolist())
+            offset += 4 * length
+        state[name] = registers
+
+    for name in MEMORIES:
+        (n_runs,) = UINT32.unpack_from(buffer, offset)
+        offset += UINT32.size
+        runs = []
+        for _ in range(n_runs):
+            start, length = RUN.unpack_from(buffer, offset)
+            offset += RUN.size
+            runs.append((start, bytes_words(buffer, offset, length)))
+            offset += 4 * length
+        state["memories"][name] = runs
+
+    (n_records,) = UINT64.unpack_from(buffer, offset)
+    offset += UINT64.size
+    trace = []
+    for _ in range(n_records):
+        record, offset = decode_record(buffer, offset)
+        trace.append(record)
+    state["trace"] = trace
+    return state
+
+def encode_instr(instr: tuple):
+    word, fu, cycles, operands, idx = instr
+    encoded = INSTR.pack(idx, fu, cycles, len(word)) + word.encode("ascii")
+    return encoded + UINT8.pack(len(operands)) + struct.pack("<%dh" % len(operands), *operands)
+
+def decode_instr(buffer, offset: int):
+    # Returns ((word, fu, cycles, operands, idx), offset of what follows)
+    idx, fu, cycles, word_length = INSTR.unpack_from(buffer, offset)
+    offset += INSTR.size
+    word = bytes(buffer[offset:offset + word_length]).decode("ascii")
+    offset += word_length
+    (n_operands,) = UINT8.unpack_from(buffer, offset)
+    offset += UINT8.size
+    operands = struct.unpack_from("<%dh" % n_operands, buffer, offset)
+    return (word, fu, cycles, operands, idx), offset + 2 * n_operands
+
+def write_timing_checkpoint(filepath, state: dict):
+    parts = [HEADER.pack(TIMING_CHECKPOINT_MAGIC, TIMING_CHECKPOINT_VERSION)]
+    if_halt, id_halt, ex_halt = state["halt"]
+    parts.append(TIMING_STATE.pack(state["cycle"], state["VL"], if_halt | (id_halt << 1) | (ex_halt << 2), *state["busy"]))
+    instr_idx, record, dispatch_success = state["fetch"]
+    parts.append(FETCH.pack(instr_idx, (record is not None) | (dispatch_success << 1)))
+    if record is not None:
+        parts.append(encode_record(record))
+    parts.append(TRACE.pack(*state["trace"]))
+    for instrs, (cycles, occupancy, full_cycles, peak) in state["queues"]:
+        parts.append(QUEUE.pack(cycles, occupancy, full_cycles, peak, len(instrs)))
+        parts.extend([encode_instr(instr) for instr in instrs])
+    parts.append(UINT8.pack(len(state["FUs"])))
+    for instr, cycles in state["FUs"]:
+        parts.append(FU_STATE.pack(instr is not None, cycles))
+        if instr is not None:
+            parts.append(encode_instr(instr))
+    base, retired_flags, peak = state["diagram"]
+    parts.append(DIAGRAM.pack(base, peak, len(retired_flags)))
+    parts.append(bytes([bool(retired) for retired in retired_flags]))
+    parts.append(UINT16.pack(len(state["config"])))
+    for name, value in state["config"].items():
+        encoded_name = name.encode("utf-8")
+        parts.append(UINT8.pack(len(encoded_name)) + encoded_name + INT64.pack(value))
+    with open(filepath, 'wb') as f:
+        f.write(b"".join(parts))
+
+def read_timing_checkpoint(filepath):
+    with open(filepath, 'rb') as f:
+        buffer = f.read()
+    if len(buffer) < HEADER.size or HEADER.unpack_from(buffer, 0) != (TIMING_CHECKPOINT_MAGIC, TIMING_CHECKPOINT_VERSION):
+        raise ValueError("Not a timing checkpoint (or unsupported version): " + filepath)
+    try:
+        offset = HEADER.size
+        cycle, vl, halt, fu_mask, srf_mask, vrf_mask = TIMING_STATE.unpack_from(buffer, offset)
+        offset += TIMING_STATE.size
+        state = {"cycle": cycle, "VL": vl, "halt": (bool(halt & 1), bool(halt & 2), bool(halt & 4)), "busy": (fu_mask, srf_mask, vrf_mask)}
+
+        instr_idx, flags = FETCH.unpack_from(buffer, offset)
+        offset += FETCH.size
+        record = None
+        if flags & 1:
+            record, offset = decode_record(buffer, offset)
+        state["fetch"] = (instr_idx, record, bool(flags & 2))
+        state["trace"] = TRACE.unpack_from(buffer, offset)
+        offset += TRACE.size
+
+        state["queues"] = []
+        for _ in range(3):
+            cycles, occupancy, full_cycles, peak, n_instrs = QUEUE.unpack_from(buffer, offset)
+            offset += QUEUE.size
+            instrs = []
+            for _ in range(n_instrs):
+                instr, offset = decode_instr(buffer, offset)
+                instrs.append(instr)
+            state["queues"].append((instrs, (cycles, occupancy, full_cycles, peak)))
+
+        state["FUs"] = []
+        (n_fus,) = UINT8.unpack_from(buffer, offset)
+        offset += UINT8.size
+        for _ in range(n_fus):
+            present, cycles = FU_STATE.unpack_from(buffer, offset)
+            offset += FU_STATE.size
+            instr = None
+            if present:
+                instr, offset = decode_instr(buffer, offset)
+            state["FUs"].append((instr, cycles))
+
+        base, peak, n_rows = DIAGRAM.unpack_from(buffer, offset)
+        offset += DIAGRAM.size
+        state["diagram"] = (base, [bool(retired) for retired in buffer[offset:offset + n_rows]], peak)
+        offset += n_rows
+
+        (n_params,) = UINT16.unpack_from(buffer, offset)
+        offset += UINT16.size
+        config = {}
+        for _ in range(n_params):
+            (length,) = UINT8.unpack_from(buffer, offset)
+            offset += UINT8.size
+            name = bytes(buffer[offset:offset + length]).decode("utf-8")
+            offset += length
+            (config[name],) = INT64.unpack_from(buffer, offset)
+            offset += INT64.size
+        state["config"] = config
+    except (struct.error, IndexError, UnicodeDecodeError):
+        raise ValueError("Truncated or corrupt timing checkpoint: " + filepath)
+    return state
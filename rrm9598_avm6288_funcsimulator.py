@@ -4,15 +4,82 @@
 # -------------------------------------------------------------
 
 import os
+import sys
+import mmap
 import argparse
+from array import array
+import operator
+import functools
+
+from rrm9598_avm6288_trace import pack_addresses, format_resolved, write_trace
+from rrm9598_avm6288_cache import SimCache
+from rrm9598_avm6288_checkpoint import input_digest, memory_runs, write_checkpoint, read_checkpoint
+
+try:
+    import numpy as np
+except ImportError:
+    np = None # NumPy is only needed for the numpy execution backend
+
+# Opcodes of the pre-decoded program, OPCODES[opcode] is the instruction word
+OPCODES = ["HALT",
+           "ADDVV", "ADDVS", "SUBVV", "SUBVS", "MULVV", "MULVS", "DIVVV", "DIVVS",
+           "SEQVV", "SEQVS", "SNEVV", "SNEVS", "SGTVV", "SGTVS", "SLTVV", "SLTVS", "SGEVV", "SGEVS", "SLEVV", "SLEVS",
+           "CVM", "POP", "MTCL", "MFCL",
+           "LV", "SV", "LVWS", "SVWS", "LVI", "SVI", "LS", "SS",
+           "ADD", "SUB", "AND", "OR", "XOR", "SLL", "SRL", "SRA",
+           "BEQ", "BNE", "BGT", "BLT", "BGE", "BLE",
+           "UNPACKLO", "UNPACKHI", "PACKLO", "PACKHI",
+           "INVALID"]
+OPCODE_IDS = {word: opcode for opcode, word in enumerate(OPCODES)}
+(OP_HALT,
+ OP_ADDVV, OP_ADDVS, OP_SUBVV, OP_SUBVS, OP_MULVV, OP_MULVS, OP_DIVVV, OP_DIVVS,
+ OP_SEQVV, OP_SEQVS, OP_SNEVV, OP_SNEVS, OP_SGTVV, OP_SGTVS, OP_SLTVV, OP_SLTVS, OP_SGEVV, OP_SGEVS, OP_SLEVV, OP_SLEVS,
+ OP_CVM, OP_POP, OP_MTCL, OP_MFCL,
+ OP_LV, OP_SV, OP_LVWS, OP_SVWS, OP_LVI, OP_SVI, OP_LS, OP_SS,
+ OP_ADD, OP_SUB, OP_AND, OP_OR, OP_XOR, OP_SLL, OP_SRL, OP_SRA,
+ OP_BEQ, OP_BNE, OP_BGT, OP_BLT, OP_BGE, OP_BLE,
+ OP_UNPACKLO, OP_UNPACKHI, OP_PACKLO, OP_PACKHI,
+ OP_INVALID) = range(len(OPCODES))
+
+# opcode: (operation, is the second operand a scalar register)
+VECTOR_ARITHMETIC_OPS = {OP_ADDVV: (operator.add, False), OP_ADDVS: (operator.add, True),
+                         OP_SUBVV: (operator.sub, False), OP_SUBVS: (operator.sub, True),
+                         OP_MULVV: (operator.mul, False), OP_MULVS: (operator.mul, True),
+                         OP_DIVVV: (operator.floordiv, False), OP_DIVVS: (operator.floordiv, True)}
+
+# opcode: (comparison, is the second operand a scalar register)
+VECTOR_COMPARE_OPS = {OP_SEQVV: (operator.eq, False), OP_SEQVS: (operator.eq, True),
+                      OP_SNEVV: (operator.ne, False), OP_SNEVS: (operator.ne, True),
+                      OP_SGTVV: (operator.gt, False), OP_SGTVS: (operator.gt, True),
+                      OP_SLTVV: (operator.lt, False), OP_SLTVS: (operator.lt, True),
+                      OP_SGEVV: (operator.ge, False), OP_SGEVS: (operator.ge, True),
+                      OP_SLEVV: (operator.le, False), OP_SLEVS: (operator.le, True)}
+
+# opcode: operation(scalar1, scalar2, register bits)
+SCALAR_OPS = {OP_ADD: lambda a, b, bits: a + b,
+              OP_SUB: lambda a, b, bits: a - b,
+              OP_AND: lambda a, b, bits: a & b,
+              OP_OR:  lambda a, b, bits: a | b,
+              OP_XOR: lambda a, b, bits: a ^ b,
+              OP_SLL: lambda a, b, bits: a << b,
+              # https://realpython.com/python-bitwise-operators/#arithmetic-vs-logical-shift
+              OP_SRL: lambda a, b, bits: (a % (1 << bits)) >> b,
+              OP_SRA: lambda a, b, bits: a >> b}
+
+# opcode: comparison deciding if the branch is taken
+BRANCH_OPS = {OP_BEQ: operator.eq, OP_BNE: operator.ne,
+              OP_BGT: operator.gt, OP_BLT: operator.lt,
+              OP_BGE: operator.ge, OP_BLE: operator.le}
 
 class IMEM(object):
-    def __init__(self, iodir):
+    def __init__(self, iodir, cache = None):
         self.size = pow(2, 16) # Can hold a maximum of 2^16 instructions.
         self.filepath = os.path.abspath(os.path.join(iodir, "Code.asm"))
+        self.cache = cache # SimCache for the parsed program, or None
         self.instructions = []
         self.resolved_program = []
         self.opfilepath = os.path.abspath(os.path.join(iodir, "Resolved_Code.txt"))
+        self.optracepath = os.path.abspath(os.path.join(iodir, "Resolved_Code.bin"))
 
         try:
             with open(self.filepath, 'r') as insf:
@@ -29,10 +96,18 @@ class IMEM(object):
             print("IMEM - ERROR: Invalid memory access at index: ", idx, " with memory size: ", self.size)
             return None
         
-    def dump(self):
+    def dump(self, binary = False):
+        # resolved_program holds records of the resolved code, see rrm9598_avm6288_trace
+        if binary:
+            try:
+                write_trace(self.optracepath, self.resolved_program)
+                print("IMEM - Dumped resolved code flow trace in path:", self.optracepath)
+            except:
+                print("IMEM - ERROR: Couldn't open file in path:", self.optracepath)
+            return
         try:
             with open(self.opfilepath, 'w') as resolved_code_file:
-                lines = [str(line) + '\n' for line in self.resolved_program]
+                lines = [format_resolved(record) + '\n' for record in self.resolved_program]
                 resolved_code_file.writelines(lines)
                 print("IMEM - Dumped resolved code flow file in path:", self.opfilepath)
         except:
@@ -40,23 +115,48 @@ class IMEM(object):
 
 class DMEM(object):
     # Word addressible - each address contains 32 bits.
-    def __init__(self, name, iodir, addressLen):
+    def __init__(self, name, iodir, addressLen, image = False, cache = None):
         self.name = name
         self.size = pow(2, addressLen)
         self.min_value  = -pow(2, 31)
         self.max_value  = pow(2, 31) - 1
         self.ipfilepath = os.path.abspath(os.path.join(iodir, name + ".txt"))
         self.opfilepath = os.path.abspath(os.path.join(iodir, name + "OP.txt"))
-        self.data = []
+        # Binary memory images - raw little-endian 32-bit words
+        self.ipimagepath = os.path.abspath(os.path.join(iodir, name + ".bin"))
+        self.opimagepath = os.path.abspath(os.path.join(iodir, name + "OP.bin"))
+        self.data = array('i')
+        self.touched = set() # addresses written since the memory was loaded
+        self.initialized = 0
+        self.sourcepath = self.ipimagepath if image else self.ipfilepath # input the data was loaded from
 
         try:
-            with open(self.ipfilepath, 'r') as ipf:
-                self.data = [int(line.strip()) for line in ipf.readlines()]
-            print(self.name, "- Data loaded from file:", self.ipfilepath)
-            # print(self.name, "- Data:", self.data)
-            self.data.extend([0x0 for i in range(self.size - len(self.data))])
+            if image:
+                self.load_image(self.ipimagepath)
+                print(self.name, "- Data loaded from image:", self.ipimagepath)
+            elif cache is not None and cache.lookup(self.name, [self.ipfilepath], ".bin") is not None:
+                # Parsed before - load the cached image of the text file
+                self.load_image(cache.lookup(self.name, [self.ipfilepath], ".bin"))
+                print(self.name, "- Data loaded from cached image of file:", self.ipfilepath)
+            else:
+                with open(self.ipfilepath, 'r') as ipf:
+                    self.data = array('i', map(int, ipf.read().split()))
+                if cache is not None:
+                    cache.store_words(self.name, [self.ipfilepath], self.data)
+                print(self.name, "- Data loaded from file:", self.ipfilepath)
+            # Number of words loaded from the input file, the rest of the memory is zero
+            self.initialized = len(self.data)
+            self.data.frombytes(bytes(self.data.itemsize * max(self.size - len(self.data), 0)))
         except:
-            print(self.name, "- ERROR: Couldn't open input file in path:", self.ipfilepath)
+            print(self.name, "- ERROR: Couldn't open input file in path:", self.ipimagepath if image else self.ipfilepath)
+
+    def load_image(self, path):
+        with open(path, 'rb') as ipf:
+            if os.path.getsize(path) > 0:
+                with mmap.mmap(ipf.fileno(), 0, access=mmap.ACCESS_READ) as image:
+                    self.data.frombytes(image)
+        if sys.byteorder == 'big':
+            self.data.byteswap()
 
     def Read(self, idx: int): # Use this to read from DMEM.
         if idx < self.size:
@@ -68,20 +168,50 @@ class DMEM(object):
     def Write(self, idx: int, val): # Use this to write into DMEM.
         if idx < self.size:
             self.data[idx] = val
+            self.touched.add(idx)
             return self.data[idx]
         else:
             print("DMEM - ERROR: Invalid memory access at index: ", idx, " with memory size: ", self.size)
             return None
 
-    def dump(self):
+    def ranges(self):
+        # Sorted (start, end) address ranges which were loaded from the input file or written since
+        ranges = []
+        if self.initialized > 0:
+            ranges.append([0, self.initialized])
+        for idx in sorted(self.touched):
+            if ranges and ranges[-1][0] <= idx <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], idx + 1)
+            else:
+                ranges.append([idx, idx + 1])
+        return ranges
+
+    def dump(self, sparse = False):
+        # Dense dump writes every word, sparse dump writes only the loaded and written ranges, each one prefixed by "@<start address>"
         try:
             with open(self.opfilepath, 'w') as opf:
-                lines = [str(data) + '\n' for data in self.data]
-                opf.writelines(lines)
+                if sparse:
+                    for start, end in self.ranges():
+                        opf.write("@" + str(start) + "\n")
+                        opf.write("".join([str(data) + '\n' for data in self.data[start:end]]))
+                else:
+                    opf.write("".join([str(data) + '\n' for data in self.data]))
             print(self.name, "- Dumped data into output file in path:", self.opfilepath)
         except:
             print(self.name, "- ERROR: Couldn't open output file in path:", self.opfilepath)
 
+    def dump_image(self):
+        try:
+            data = self.data
+            if sys.byteorder == 'big':
+                data = array('i', data)
+                data.byteswap()
+            with open(self.opimagepath, 'wb') as opf:
+                data.tofile(opf)
+            print(self.name, "- Dumped data into output image in path:", self.opimagepath)
+        except:
+            print(self.name, "- ERROR: Couldn't open output image in path:", self.opimagepath)
+
 class RegisterFile(object):
     def __init__(self, name, count, length = 1, size = 32):
         self.name       = name
@@ -134,24 +264,134 @@ class RegisterFile(object):
         except:
             print(self.name, "- ERROR: Couldn't open output file in path:", opfilepath)
 
+class NumpyRegisterFile(RegisterFile):
+    # Register file stored as a (count x length) int64 array, used by the numpy execution backend.
+    # Values are saturated to the register width on every write, so products of two registers never overflow int64.
+    def __init__(self, name, count, length = 1, size = 32):
+        super().__init__(name, count, length, size)
+        self.registers  = np.zeros((self.reg_count, self.vec_length), dtype=np.int64)
+
+    def Read(self, idx: int):
+        if idx < self.reg_count:
+            return self.registers[idx]
+        else:
+            print(self.name, "- ERROR: Invalid register access at index: ", idx, " with register count: ", self.reg_count)
+            return None
+
+    def Write(self, idx: int, val):
+        if idx < self.reg_count:
+            if len(val) == self.vec_length:
+                val = np.asarray(val, dtype=np.int64)
+                overflow = (val > self.max_value) | (val < self.min_value)
+                for i in np.flatnonzero(overflow):
+                    print(self.name, "- WARNING: Register write overflow at index: ", idx, " with vector index: ", i)
+                # Handling Overflow Exception by saturating to the minimum / maximum value
+                self.registers[idx] = np.clip(val, self.min_value, self.max_value)
+                return self.registers[idx]
+            else:
+                print(self.name, "- ERROR: Invalid register write at index: ", idx, " with vector length: ", len(val))
+                return None
+        else:
+            print(self.name, "- ERROR: Invalid register write at index: ", idx, " with register count: ", self.reg_count)
+            return None
+
+    def dump(self, iodir):
+        opfilepath = os.path.abspath(os.path.join(iodir, self.name + ".txt"))
+        try:
+            with open(opfilepath, 'w') as opf:
+                row_format = "{:<13}"*self.vec_length
+                lines = [row_format.format(*[str(i) for i in range(self.vec_length)]) + "\n", '-'*(self.vec_length*13) + "\n"]
+                lines += [row_format.format(*[str(val) for val in data]) + "\n" for data in self.registers.tolist()]
+                opf.writelines(lines)
+            print(self.name, "- Dumped data into output file in path:", opfilepath)
+        except:
+            print(self.name, "- ERROR: Couldn't open output file in path:", opfilepath)
+
+class VectorMaskRegister(object):
+    # Vector mask register stored as a packed integer - element i of the vector is enabled by bit (length - 1 - i).
+    # The numpy backend reads and writes it as a boolean array instead, both forms are kept in sync on every write.
+    def __init__(self, name, length = 64, size = 66):
+        self.name       = name
+        self.vec_length = length
+        self.reg_bits   = size # extra bits to avoid overflow error, explained further in document
+        self.all_ones   = (1 << self.vec_length) - 1
+        self.element_bits = [1 << (self.vec_length - 1 - i) for i in range(self.vec_length)]
+        self.value      = self.all_ones
+        self.array      = None
+        self.enabled_cache = {} # vector length -> indices of the enabled elements, for the current value
+
+    def Read(self, idx: int = 0):
+        return [self.value]
+
+    def Write(self, idx: int, val: list):
+        self.value = val[0]
+        self.array = None
+        self.enabled_cache = {}
+        return [self.value]
+
+    def write_bits(self, bits):
+        # Writes a boolean numpy array, with one entry per vector element
+        self.value = int.from_bytes(np.packbits(bits).tobytes(), 'big')
+        self.array = bits
+        self.enabled_cache = {}
+
+    def as_array(self):
+        # Boolean numpy array, with one entry per vector element
+        if self.array is None:
+            mask_bytes = (self.value & self.all_ones).to_bytes(self.vec_length // 8, 'big')
+            self.array = np.unpackbits(np.frombuffer(mask_bytes, dtype=np.uint8)).astype(bool)
+        return self.array
+
+    def enabled_elements(self, vector_length: int):
+        # Indices of the elements enabled by the mask, below the vector length
+        enabled = self.enabled_cache.get(vector_length)
+        if enabled == None:
+            value = self.value
+            enabled = [i for i in range(vector_length) if value & self.element_bits[i]]
+            self.enabled_cache[vector_length] = enabled
+        return enabled
+
+    def popcount(self):
+        return bin(self.value).count("1")
+
 class Core():
-    def __init__(self, imem: IMEM, sdmem: DMEM, vdmem: DMEM):
+    def __init__(self, imem: IMEM, sdmem: DMEM, vdmem: DMEM, backend = "list", verbose = True):
         self.IMEM = imem
         self.SDMEM = sdmem
         self.VDMEM = vdmem
 
+        # Print the program counter and instruction of every executed instruction (off in co-simulation)
+        self.verbose = verbose
+
+        # Execution backend - "list" executes vector instructions element by element,
+        # "numpy" keeps the VRF in a numpy array and executes vector arithmetic on whole vectors
+        self.backend = backend
+        if self.backend == "numpy":
+            if np is None:
+                print("Core - ERROR: The numpy backend needs numpy to be installed")
+                raise ImportError("numpy")
+            VRF = NumpyRegisterFile("VRF", 8, 64)
+        else:
+            VRF = RegisterFile("VRF", 8, 64)
+
         self.RFs = {"SRF": RegisterFile("SRF", 8),
-                    "VRF": RegisterFile("VRF", 8, 64)}
+                    "VRF": VRF}
         
         ### Special Purpose Registers
-        self.SRs = {"VM": RegisterFile("VM", 1, 1, 66), # extra bits to avoid overflow error, explained further in document
+        self.SRs = {"VM": VectorMaskRegister("VM", self.RFs["VRF"].vec_length, 66),
                      "VL": RegisterFile("VL", 1)}
         
         # Initialising Vector Length Register as the MVL
         self.SRs["VL"].Write(0, [self.RFs["VRF"].vec_length])
         
         # Intialising Vector Mask Register with all 1s
-        self.SRs["VM"].Write(0, [int('1' * self.RFs["VRF"].vec_length, 2)])
+        self.SRs["VM"].Write(0, [self.SRs["VM"].all_ones])
+
+        # Program counter of the next instruction, and the number of dynamic instructions executed
+        self.program_counter = 0
+        self.instruction_count = 0
+        # Checkpoints to write - instruction count : checkpoint file path
+        self.checkpoints = {}
 
     def get_operands(self, instruction: list):
         if len(instruction) == 4:
@@ -181,11 +421,16 @@ class Core():
             return None
     
     def read_code_file(self):
+        if self.IMEM.cache is not None:
+            program = self.IMEM.cache.load("Code", [self.IMEM.filepath])
+            if program is not None:
+                return program
+
         line_counter = 0
         program = list()
 
-        while(line_counter < len(imem.instructions)):
-            current_line = imem.Read(line_counter)
+        while(line_counter < len(self.IMEM.instructions)):
+            current_line = self.IMEM.Read(line_counter)
             
             # Logic to handle inline comments and line comments
             if '#' in current_line:
@@ -206,1032 +451,558 @@ class Core():
             # Add the instruction in the program list
             program.append(current_line)
 
+        if self.IMEM.cache is not None:
+            self.IMEM.cache.store("Code", [self.IMEM.filepath], program)
         return program
-        
+
+    def predecode(self, program: list):
+        '''
+        Turns the program from read_code_file into a list of records = (
+            opcode: index into OPCODES,
+            operands: register indices / immediates as returned by get_operands,
+            instruction: the instruction tokens, used for printing,
+            resolved: the resolved code record, for instructions which do not modify it while executing
+        )
+        '''
+        records = []
+        for current_instruction in program:
+            opcode = OPCODE_IDS.get(current_instruction[0], OP_INVALID)
+            operands = None if opcode == OP_INVALID else self.get_operands(current_instruction)
+            records.append((opcode, operands, current_instruction, (current_instruction[0], tuple(current_instruction[1:]), None, None)))
+        return records
+
+    def build_dispatch_table(self):
+        # Dispatch table - opcode -> handler(program_counter, operands, instruction)
+        # A handler returns (next program counter, resolved record) or None to stop the program without logging it.
+        # Next program counter is None for HALT, resolved record is None when the instruction is resolved unchanged.
+        table = [self.exec_invalid] * len(OPCODES)
+        table[OP_HALT] = self.exec_halt
+        exec_vector_arithmetic = self.exec_vector_arithmetic_numpy if self.backend == "numpy" else self.exec_vector_arithmetic
+        for opcode, (operation, scalar_operand) in VECTOR_ARITHMETIC_OPS.items():
+            table[opcode] = functools.partial(exec_vector_arithmetic, operation, scalar_operand)
+        for opcode, (comparison, scalar_operand) in VECTOR_COMPARE_OPS.items():
+            table[opcode] = functools.partial(self.exec_vector_compare, comparison, scalar_operand)
+        table[OP_CVM] = self.exec_cvm
+        table[OP_POP] = self.exec_pop
+        table[OP_MTCL] = self.exec_mtcl
+        table[OP_MFCL] = self.exec_mfcl
+        table[OP_LV] = self.exec_lv
+        table[OP_SV] = self.exec_sv
+        table[OP_LVWS] = self.exec_lvws
+        table[OP_SVWS] = self.exec_svws
+        table[OP_LVI] = self.exec_lvi
+        table[OP_SVI] = self.exec_svi
+        table[OP_LS] = self.exec_ls
+        table[OP_SS] = self.exec_ss
+        for opcode, operation in SCALAR_OPS.items():
+            table[opcode] = functools.partial(self.exec_scalar, operation)
+        for opcode, comparison in BRANCH_OPS.items():
+            table[opcode] = functools.partial(self.exec_branch, comparison)
+        table[OP_UNPACKLO] = self.exec_unpacklo
+        table[OP_UNPACKHI] = self.exec_unpackhi
+        table[OP_PACKLO] = self.exec_packlo
+        table[OP_PACKHI] = self.exec_packhi
+        return table
+
     def run(self):
+        for record in self.execute():
+            self.IMEM.resolved_program.append(record)
+
+    def execute(self):
+        # Generator over the resolved code records of the executed instructions, in program order.
+        # run() collects them into IMEM, the timing simulator's co-simulation mode consumes them directly.
         print("")
-        program_counter = 0
+        program_counter = self.program_counter
         
-        program = self.read_code_file()
+        program = self.predecode(self.read_code_file())
+        handlers = self.build_dispatch_table()
         
         while(True):
+            if self.instruction_count in self.checkpoints:
+                self.program_counter = program_counter
+                self.save_checkpoint(self.checkpoints[self.instruction_count])
+
             # --- ISSUE Stage ---
-            current_instruction = program[program_counter]
-            current_instruction_print = current_instruction.copy()
+            opcode, operands, current_instruction, resolved = program[program_counter]
 
-            print("Program Counter     : ", program_counter)
-            print("Current Instruction : ", current_instruction)
+            if self.verbose:
+                print("Program Counter     : ", program_counter)
+                print("Current Instruction : ", current_instruction)
             
             # --- DECODE + EXECUTE + WRITEBACK Stage ---
-            instruction_word = current_instruction[0]
-            # print("Instruction Word    : ", instruction_word)
-
-            if instruction_word == "HALT":
-                # --- EXECUTE : HALT --- 
-                imem.resolved_program.append(str(" ".join(current_instruction_print)))
+            result = handlers[opcode](program_counter, operands, current_instruction)
+            if result == None:
+                break
+            next_program_counter, resolved_record = result
+            self.instruction_count += 1
+            yield resolved if resolved_record == None else resolved_record
+            if next_program_counter == None:
                 # print("Stopping the program execution!")
                 break
-            
-            # ----- VECTOR ARITHMETIC OPERATIONS
-            elif instruction_word == "ADDVV":
-                # --- DECODE : ADDVV ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : ADDVV ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                # print("Current vector 1 value : ", vector1)
-                # print("Current vector 2 value : ", vector2)
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                vector_mask_string = "{:064b}".format(self.SRs["VM"].Read(0)[0])
-                vector_mask_list = list(vector_mask_string)
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    if int(vector_mask_list[i]) == 1:
-                        result[i] = vector1[i] + vector2[i]
-                # --- WRITEBACK : ADDVV ---
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                # print("Updated result value   : ", self.RFs["VRF"].Read(destination_reg_idx))
-                # TODO - Test this instruction
-            elif instruction_word == "ADDVS":
-                # --- DECODE : ADDVS ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : ADDVS ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
-                # print("Current vector 1 value : ", vector1)
-                # print("Current vector 2 value : ", vector2)
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                vector_mask_string = "{:064b}".format(self.SRs["VM"].Read(0)[0])
-                vector_mask_list = list(vector_mask_string)
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    if int(vector_mask_list[i]) == 1:
-                        result[i] = vector1[i] + vector2[i]
-                # --- WRITEBACK : ADDVS ---
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                # print("Updated result value   : ", self.RFs["VRF"].Read(destination_reg_idx))
-                # TODO - Test this instruction
-            elif instruction_word == "SUBVV":
-                # --- DECODE : SUBVV ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SUBVV ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                # print("Current vector 1 value : ", vector1)
-                # print("Current vector 2 value : ", vector2)
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                vector_mask_string = "{:064b}".format(self.SRs["VM"].Read(0)[0])
-                vector_mask_list = list(vector_mask_string)
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    if int(vector_mask_list[i]) == 1:
-                        result[i] = vector1[i] - vector2[i]
-                # --- WRITEBACK : SUBVV ---
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                # print("Updated result value   : ", self.RFs["VRF"].Read(destination_reg_idx))
-                # TODO - Test this instruction
-            elif instruction_word == "SUBVS":
-                # --- DECODE : SUBVS ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SUBVS ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
-                # print("Current vector 1 value : ", vector1)
-                # print("Current vector 2 value : ", vector2)
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                vector_mask_string = "{:064b}".format(self.SRs["VM"].Read(0)[0])
-                vector_mask_list = list(vector_mask_string)
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    if int(vector_mask_list[i]) == 1:
-                        result[i] = vector1[i] - vector2[i]
-                # --- WRITEBACK : SUBVS ---
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                # print("Updated result value   : ", self.RFs["VRF"].Read(destination_reg_idx))
-                # TODO - Test this instruction
-            elif instruction_word == "MULVV":
-                # --- DECODE : MULVV ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : MULVV ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                # print("Current vector 1 value : ", vector1)
-                # print("Current vector 2 value : ", vector2)
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                vector_mask_string = "{:064b}".format(self.SRs["VM"].Read(0)[0])
-                vector_mask_list = list(vector_mask_string)
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    if int(vector_mask_list[i]) == 1:
-                        result[i] = vector1[i] * vector2[i]
-                # --- WRITEBACK : MULVV ---
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                # print("Updated result value   : ", self.RFs["VRF"].Read(destination_reg_idx))
-                # TODO - Test this instruction
-            elif instruction_word == "MULVS":
-                # --- DECODE : MULVS ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : MULVS ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
-                # print("Current vector 1 value : ", vector1)
-                # print("Current vector 2 value : ", vector2)
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                vector_mask_string = "{:064b}".format(self.SRs["VM"].Read(0)[0])
-                vector_mask_list = list(vector_mask_string)
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    if int(vector_mask_list[i]) == 1:
-                        result[i] = vector1[i] * vector2[i]
-                # --- WRITEBACK : MULVS ---
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                # print("Updated result value   : ", self.RFs["VRF"].Read(destination_reg_idx))
-                # TODO - Test this instruction
-            elif instruction_word == "DIVVV":
-                # --- DECODE : DIVVV ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : DIVVV ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                # print("Current vector 1 value : ", vector1)
-                # print("Current vector 2 value : ", vector2)
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                vector_mask_string = "{:064b}".format(self.SRs["VM"].Read(0)[0])
-                vector_mask_list = list(vector_mask_string)
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    # TODO - Check Divide by zero condition
-                    if int(vector_mask_list[i]) == 1:
-                        result[i] = vector1[i] // vector2[i]
-                # --- WRITEBACK : DIVVV ---
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                # print("Updated result value   : ", self.RFs["VRF"].Read(destination_reg_idx))
-                # TODO - Test this instruction
-            elif instruction_word == "DIVVS":
-                # --- DECODE : DIVVS ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : DIVVS ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
-                # print("Current vector 1 value : ", vector1)
-                # print("Current vector 2 value : ", vector2)
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                vector_mask_string = "{:064b}".format(self.SRs["VM"].Read(0)[0])
-                vector_mask_list = list(vector_mask_string)
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    # TODO - Check Divide by zero condition
-                    if int(vector_mask_list[i]) == 1:
-                        result[i] = vector1[i] // vector2[i]
-                # --- WRITEBACK : DIVVS ---
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                # print("Updated result value   : ", self.RFs["VRF"].Read(destination_reg_idx))
-                # TODO - Test this instruction
-            
-            # ----- VECTOR MASK REGISTER OPERATIONS
-            elif instruction_word == "SEQVV":
-                # --- DECODE : SEQVV ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SEQVV ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] == vector2[i] else 0
-                # --- WRITEBACK : SEQVV ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SEQVS":
-                # --- DECODE : SEQVS ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SEQVS ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] == vector2[i] else 0
-                # --- WRITEBACK : SEQVS ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SNEVV":
-                # --- DECODE : SNEVV ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SNEVV ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] != vector2[i] else 0
-                # --- WRITEBACK : SNEVV ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SNEVS":
-                # --- DECODE : SNEVS ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SNEVS ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] != vector2[i] else 0
-                # --- WRITEBACK : SNEVS ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SGTVV":
-                # --- DECODE : SGTVV ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SGTVV ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] > vector2[i] else 0
-                # --- WRITEBACK : SGTVV ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SGTVS":
-                # --- DECODE : SGTVS ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SGTVS ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] > vector2[i] else 0
-                # --- WRITEBACK : SGTVS ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SLTVV":
-                # --- DECODE : SLTVV ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SLTVV ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] < vector2[i] else 0
-                # --- WRITEBACK : SLTVV ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SLTVS":
-                # --- DECODE : SLTVS ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SLTVS ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] < vector2[i] else 0
-                # --- WRITEBACK : SLTVS ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SGEVV":
-                # --- DECODE : SGEVV ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SGEVV ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] >= vector2[i] else 0
-                # --- WRITEBACK : SGEVV ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SGEVS":
-                # --- DECODE : SGEVS ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SGEVS ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] >= vector2[i] else 0
-                # --- WRITEBACK : SGEVS ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SLEVV":
-                # --- DECODE : SLEVV ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SLEVV ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] <= vector2[i] else 0
-                # --- WRITEBACK : SLEVV ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "SLEVS":
-                # --- DECODE : SLEVS ---
-                operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SLEVS ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
-                result = [0] * self.RFs["VRF"].vec_length
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    result[i] = 1 if vector1[i] <= vector2[i] else 0
-                # --- WRITEBACK : SLEVS ---
-                result_string = ''.join(str(x) for x in result)
-                vector_mask_value = int(result_string, 2)
-                self.SRs["VM"].Write(0, [vector_mask_value])
-                # TODO - Test this instruction
-            elif instruction_word == "CVM":
-                # --- EXECUTE : CVM --- 
-                # print("Clearing the Vector Mask Register...")
-                # print("Current VM Value : ", bin(self.SRs["VM"].Read(0)[0]))
-                self.SRs["VM"].Write(0, [int('1' * self.RFs["VRF"].vec_length, 2)])
-                # print("Updated VM Value : ", bin(self.SRs["VM"].Read(0)[0]), self.SRs["VM"].Read(0)[0])
-            elif instruction_word == "POP":
-                # --- DECODE : POP ---
-                destination_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : POP --- 
-                count = bin(self.SRs["VM"].Read(0)[0]).count("1")
-                if count <= self.SRs["VM"].reg_bits:
-                    write_result = self.RFs["SRF"].Write(destination_reg_idx, [count])
-                    if write_result == None:
-                        break
-                else:
-                    print("WARNING: Invalid number popped, debug code!")
-                    self.RFs["SRF"].Write(destination_reg_idx, [self.SRs["VM"].reg_bits])
-                # TODO - Test this instruction
-            
-            # ----- VECTOR LENGTH REGISTER OPERATIONS
-            elif instruction_word == "MTCL":
-                # --- DECODE : MTCL ---
-                operand_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : MTCL --- 
-                # print("Moving the current value of operand in Vector Length Register...")
-                # print("Current VL Value  : ", self.SRs["VL"].Read(0)[0])
-                # print("Current operand Value : ", self.RFs["SRF"].Read(operand_reg_idx)[0])
-                value = self.RFs["SRF"].Read(operand_reg_idx)
-                # print(value)
-                if value == None:
-                    break
-                value = value[0]
-                if value <= self.RFs["VRF"].vec_length:
-                    self.SRs["VL"].Write(0, [value])
-                    current_instruction_print.append('[' + str(value) + ']')
-                    # print("Updated VL Value  : ", self.SRs["VL"].Read(0)[0])
-                else:
-                    print("WARNING: Invalid Value for Vector Length Register, debug code!")
-            elif instruction_word == "MFCL":
-                # --- DECODE : MFCL ---
-                operand_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : MFCL --- 
-                # print("Moving the current value of Vector Length Register in operand...")
-                # print("Current VL Value  : ", self.SRs["VL"].Read(0)[0])
-                # print("Current operand Value : ", self.RFs["SRF"].Read(operand_reg_idx)[0])
-                self.RFs["SRF"].Write(operand_reg_idx, self.SRs["VL"].Read(0))
-                # print("Updated operand Value : ", self.RFs["SRF"].Read(operand_reg_idx)[0])
-            
-            # ----- MEMORY ACCESS OPERATIONS
-            elif instruction_word == "LV":
-                addresses = []
-                ### --- DECODE : LV ---
-                destination_reg_idx, operand1_reg_idx = self.get_operands(current_instruction)
-                ### --- EXECUTE : LV ---
-                memory_address = self.RFs["SRF"].Read(operand1_reg_idx)
-                if memory_address == None:
-                    break
-                memory_address = memory_address[0]
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    if self.VDMEM.Read(memory_address + i) != None:
-                        result[i] = self.VDMEM.Read(memory_address + i)
-                        addresses.append(str(memory_address + i))
-                    else:
-                        result[i] = 0
-                        print("WARNING: Reading from Invalid Memory Address, debug code!")
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                current_instruction_print[-1] = str("(" + ",".join(addresses) + ")")
-            elif instruction_word == "SV":
-                addresses = []
-                ### --- DECODE : SV ---
-                destination_reg_idx, operand1_reg_idx = self.get_operands(current_instruction)
-                ### --- EXECUTE : SV ---
-                memory_address = self.RFs["SRF"].Read(operand1_reg_idx)
-                if memory_address == None:
-                    break
-                memory_address = memory_address[0]
-                vector1 = self.RFs["VRF"].Read(destination_reg_idx)
-                if vector1 == None:
-                    break
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    write_result = self.VDMEM.Write(memory_address + i, vector1[i])
-                    addresses.append(str(memory_address + i))
-                    if write_result == None:
-                        print("WARNING: Trying to write on an Invalid Memory Address, debug code!")
-                current_instruction_print[-1] = str("(" + ",".join(addresses) + ")")
-            elif instruction_word == "LVWS":
-                addresses = []
-                ### --- DECODE : LVWS ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                ### --- EXECUTE : LVWS ---
-                memory_address = self.RFs["SRF"].Read(operand1_reg_idx)
-                if memory_address == None:
-                    break
-                memory_address = memory_address[0]
-                stride = self.RFs["SRF"].Read(operand2_reg_idx)
-                if stride == None:
-                    break
-                stride = stride[0]
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    if self.VDMEM.Read(memory_address + (i * stride)) != None:
-                        result[i] = self.VDMEM.Read(memory_address + (i * stride))
-                        addresses.append(str(memory_address + (i * stride)))
-                    else:
-                        result[i] = 0
-                        print("WARNING: Reading from Invalid Memory Address, debug code!")
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                current_instruction_print[-2] = str("(" + ",".join(addresses) + ")")
-                del current_instruction_print[-1]
-            elif instruction_word == "SVWS":
-                addresses = []
-                ### --- DECODE : SVWS ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                ### --- EXECUTE : SVWS ---
-                memory_address = self.RFs["SRF"].Read(operand1_reg_idx)
-                if memory_address == None:
-                    break
-                memory_address = memory_address[0]
-                stride = self.RFs["SRF"].Read(operand2_reg_idx)
-                if stride == None:
-                    break
-                stride = stride[0]
-                vector1 = self.RFs["VRF"].Read(destination_reg_idx)
-                if vector1 == None:
-                    break
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    write_result = self.VDMEM.Write(memory_address + (i * stride), vector1[i])
-                    addresses.append(str(memory_address + (i * stride)))
-                    if write_result == None:
-                        print("WARNING: Trying to write on an Invalid Memory Address, debug code!")
-                current_instruction_print[-2] = str("(" + ",".join(addresses) + ")")
-                del current_instruction_print[-1]
-                # TODO - Test this instruction
-            elif instruction_word == "LVI":
-                addresses = []
-                ### --- DECODE : LVI ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                ### --- EXECUTE : LVI ---
-                base_address = self.RFs["SRF"].Read(operand1_reg_idx)
-                if base_address == None:
-                    break
-                base_address = base_address[0]
-                offsets = self.RFs["VRF"].Read(operand2_reg_idx)
-                if offsets == None:
-                    break
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    if self.VDMEM.Read(base_address + offsets[i]) != None:
-                        result[i] = self.VDMEM.Read(base_address + offsets[i])
-                        addresses.append(str(base_address + offsets[i]))
-                    else:
-                        result[i] = 0
-                        print("WARNING: Reading from Invalid Memory Address, debug code!")
-                write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
-                if write_result == None:
-                    break
-                current_instruction_print[-2] = str("(" + ",".join(addresses) + ")")
-                del current_instruction_print[-1]
-            elif instruction_word == "SVI":
-                addresses = []
-                ### --- DECODE : SVI ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                ### --- EXECUTE : SVI ---
-                base_address = self.RFs["SRF"].Read(operand1_reg_idx)
-                if base_address == None:
-                    break
-                base_address = base_address[0]
-                offsets = self.RFs["VRF"].Read(operand2_reg_idx)
-                if offsets == None:
-                    break
-                vector1 = self.RFs["VRF"].Read(destination_reg_idx)
-                if vector1 == None:
-                    break
-                for i in range(self.SRs["VL"].Read(0)[0]):
-                    write_result = self.VDMEM.Write(base_address + offsets[i], vector1[i])
-                    addresses.append(str(base_address + offsets[i]))
-                    if write_result == None:
-                        print("WARNING: Trying to write on an Invalid Memory Address, debug code!")
-                # TODO - Test this instruction
-                current_instruction_print[-2] = str("(" + ",".join(addresses) + ")")
-                del current_instruction_print[-1]
-            elif instruction_word == "LS":
-                # --- DECODE : LS ---
-                destination_reg_idx, operand1_reg_idx, imm = self.get_operands(current_instruction)
-                # --- EXECUTE : LS ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                memory_address = scalar1 + imm
-                data = self.SDMEM.Read(memory_address)
-                if data == None:
-                    break
-                write_result = self.RFs["SRF"].Write(destination_reg_idx, [data])
-                if write_result == None:
-                    break
-                current_instruction_print[-2] = str("(" + str(memory_address) + ")")
-                del current_instruction_print[-1]
-            elif instruction_word == "SS":
-                # --- DECODE : SS ---
-                operand1_reg_idx, operand2_reg_idx, imm = self.get_operands(current_instruction)
-                # --- EXECUTE : SS ---
-                data = self.RFs["SRF"].Read(operand1_reg_idx)
-                if data == None:
-                    break
-                data = data[0]
-                scalar1 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                memory_address = scalar1 + imm
-                write_result = self.SDMEM.Write(memory_address, data)
-                if write_result == None:
-                    print("WARNING: Trying to write on an Invalid Memory Address, debug code!")
-                current_instruction_print[-2] = str("(" + str(memory_address) + ")")
-                del current_instruction_print[-1]
-
-            # ----- SCALAR OPERATIONS
-            elif instruction_word == "ADD":
-                # --- DECODE : ADD ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : ADD ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                result = scalar1 + scalar2
-                self.RFs["SRF"].Write(destination_reg_idx, [result])
-            elif instruction_word == "SUB":
-                # --- DECODE : SUB ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SUB ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                result = scalar1 - scalar2
-                self.RFs["SRF"].Write(destination_reg_idx, [result])
-            elif instruction_word == "AND":
-                # --- DECODE : AND ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : AND ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                result = scalar1 & scalar2
-                self.RFs["SRF"].Write(destination_reg_idx, [result])
-                # TODO - Test this instruction
-            elif instruction_word == "OR":
-                # --- DECODE : OR ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : OR ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                result = scalar1 | scalar2
-                self.RFs["SRF"].Write(destination_reg_idx, [result])
-                # TODO - Test this instruction
-            elif instruction_word == "XOR":
-                # --- DECODE : XOR ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : XOR ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                result = scalar1 ^ scalar2
-                self.RFs["SRF"].Write(destination_reg_idx, [result])
-                # TODO - Test this instruction
-            elif instruction_word == "SLL":
-                # --- DECODE : SLL ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SLL ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                result = scalar1 << scalar2
-                self.RFs["SRF"].Write(destination_reg_idx, [result])
-                # TODO - Test this instruction
-            elif instruction_word == "SRL":
-                # --- DECODE : SRL ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SRL ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                unsigned_integer = scalar1 % (1 << self.RFs["SRF"].reg_bits)
-                result = unsigned_integer >> scalar2
-                self.RFs["SRF"].Write(destination_reg_idx, [result])
-                # TODO - Test this instruction
-                # https://realpython.com/python-bitwise-operators/#arithmetic-vs-logical-shift
-            elif instruction_word == "SRA":
-                # --- DECODE : SRA ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : SRA ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                result = scalar1 >> scalar2
-                self.RFs["SRF"].Write(destination_reg_idx, [result])
-                # TODO - Test this instruction
-
-            # ----- CONTROL OPERATIONS
-            elif instruction_word == "BEQ":
-                # --- DECODE : BEQ ---
-                operand1_reg_idx, operand2_reg_idx, imm = self.get_operands(current_instruction)
-                # --- EXECUTE : BEQ ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                current_instruction_print[0] = 'B'
-                if scalar1 == scalar2:
-                    program_counter = program_counter + imm
-                    current_instruction_print[1] =  "(" + str(program_counter) + ")"
-                    del current_instruction_print[-1]
-                    del current_instruction_print[-1]
-                    imem.resolved_program.append(str(" ".join(current_instruction_print)))
-                    continue
-                current_instruction_print[1] = "(" + str(program_counter + 1) + ")"
-                del current_instruction_print[-1]
-                del current_instruction_print[-1]
-                # TODO - Test this instruction
-            elif instruction_word == "BNE":
-                # --- DECODE : BNE ---
-                operand1_reg_idx, operand2_reg_idx, imm = self.get_operands(current_instruction)
-                # --- EXECUTE : BNE ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                current_instruction_print[0] = 'B'
-                if scalar1 != scalar2:
-                    program_counter = program_counter + imm
-                    current_instruction_print[1] =  "(" + str(program_counter) + ")"
-                    del current_instruction_print[-1]
-                    del current_instruction_print[-1]
-                    imem.resolved_program.append(str(" ".join(current_instruction_print)))
-                    continue
-                current_instruction_print[1] = "(" + str(program_counter + 1) + ")"
-                del current_instruction_print[-1]
-                del current_instruction_print[-1]
-                # TODO - Test this instruction
-            elif instruction_word == "BGT":
-                # --- DECODE : BGT ---
-                operand1_reg_idx, operand2_reg_idx, imm = self.get_operands(current_instruction)
-                # --- EXECUTE : BGT ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                current_instruction_print[0] = 'B'
-                if scalar1 > scalar2:
-                    program_counter = program_counter + imm
-                    current_instruction_print[1] =  "(" + str(program_counter) + ")"
-                    del current_instruction_print[-1]
-                    del current_instruction_print[-1]
-                    imem.resolved_program.append(str(" ".join(current_instruction_print)))
-                    continue
-                current_instruction_print[1] = "(" + str(program_counter + 1) + ")"
-                del current_instruction_print[-1]
-                del current_instruction_print[-1]
-                # TODO - Test this instruction
-            elif instruction_word == "BLT":
-                # --- DECODE : BLT ---
-                operand1_reg_idx, operand2_reg_idx, imm = self.get_operands(current_instruction)
-                # --- EXECUTE : BLT ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                current_instruction_print[0] = 'B'
-                if scalar1 < scalar2:
-                    program_counter = program_counter + imm
-                    current_instruction_print[1] =  "(" + str(program_counter) + ")"
-                    del current_instruction_print[-1]
-                    del current_instruction_print[-1]
-                    imem.resolved_program.append(str(" ".join(current_instruction_print)))
-                    continue
-                current_instruction_print[1] = "(" + str(program_counter + 1) + ")"
-                del current_instruction_print[-1]
-                del current_instruction_print[-1]
-                # TODO - Test this instruction
-            elif instruction_word == "BGE":
-                # --- DECODE : BGE ---
-                operand1_reg_idx, operand2_reg_idx, imm = self.get_operands(current_instruction)
-                # --- EXECUTE : BGE ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                current_instruction_print[0] = 'B'
-                if scalar1 >= scalar2:
-                    program_counter = program_counter + imm
-                    current_instruction_print[1] =  "(" + str(program_counter) + ")"
-                    del current_instruction_print[-1]
-                    del current_instruction_print[-1]
-                    imem.resolved_program.append(str(" ".join(current_instruction_print)))
-                    continue
-                current_instruction_print[1] = "(" + str(program_counter + 1) + ")"
-                del current_instruction_print[-1]
-                del current_instruction_print[-1]
-                # TODO - Test this instruction
-            elif instruction_word == "BLE":
-                # --- DECODE : BLE ---
-                operand1_reg_idx, operand2_reg_idx, imm = self.get_operands(current_instruction)
-                # --- EXECUTE : BLE ---
-                scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
-                if scalar1 == None:
-                    break
-                scalar1 = scalar1[0]
-                scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
-                if scalar2 == None:
-                    break
-                scalar2 = scalar2[0]
-                current_instruction_print[0] = 'B'
-                if scalar1 <= scalar2:
-                    program_counter = program_counter + imm
-                    current_instruction_print[1] =  "(" + str(program_counter) + ")"
-                    del current_instruction_print[-1]
-                    del current_instruction_print[-1]
-                    imem.resolved_program.append(str(" ".join(current_instruction_print)))
-                    continue
-                current_instruction_print[1] = "(" + str(program_counter + 1) + ")"
-                del current_instruction_print[-1]
-                del current_instruction_print[-1]
-                # TODO - Test this instruction
-            
-            # ----- REGISTER-REGISTER SHUFFLE
-            elif instruction_word == "UNPACKLO":
-                # --- DECODE : UNPACKLO ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : UNPACKLO ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                j = 0
-                for i in range(0, self.SRs["VL"].Read(0)[0] // 2):
-                    result[j] = vector1[i]
-                    result[j+1] = vector2[i]
-                    j += 2
-                # --- WRITEBACK : UNPACKLO ---
-                self.RFs["VRF"].Write(destination_reg_idx, result)
-                # TODO - Test this instruction
-            elif instruction_word == "UNPACKHI":
-                # --- DECODE : UNPACKHI ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : UNPACKHI ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                j = 0
-                for i in range(self.SRs["VL"].Read(0)[0] // 2, self.SRs["VL"].Read(0)[0]):
-                    result[j] = vector1[i]
-                    result[j+1] = vector2[i]
-                    j += 2
-                # --- WRITEBACK : UNPACKHI ---
-                self.RFs["VRF"].Write(destination_reg_idx, result)
-                # TODO - Test this instruction
-            elif instruction_word == "PACKLO":
-                # --- DECODE : PACKLO ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : PACKLO ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                j = 0
-                mvl = self.SRs["VL"].Read(0)[0]
-                for i in range(0, mvl, 2):
-                    result[j] = vector1[i]
-                    result[(mvl // 2) + j] = vector2[i]
-                    j += 1
-                # --- WRITEBACK : PACKLO ---
-                self.RFs["VRF"].Write(destination_reg_idx, result)
-                # TODO - Test this instruction
-            elif instruction_word == "PACKHI":
-                # --- DECODE : PACKHI ---
-                destination_reg_idx, operand1_reg_idx, operand2_reg_idx = self.get_operands(current_instruction)
-                # --- EXECUTE : PACKHI ---
-                vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
-                if vector1 == None:
-                    break
-                vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
-                if vector2 == None:
-                    break
-                result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
-                j = 0
-                mvl = self.SRs["VL"].Read(0)[0]
-                for i in range(1, mvl, 2):
-                    result[j] = vector1[i]
-                    result[(mvl // 2) + j] = vector2[i]
-                    j += 1
-                # --- WRITEBACK : PACKHI ---
-                self.RFs["VRF"].Write(destination_reg_idx, result)
-                # TODO - Test this instruction
+            program_counter = next_program_counter
+            if self.verbose:
+                print("")
+        self.program_counter = program_counter
+
+    # ----- CONTROL : HALT
+    def exec_halt(self, program_counter, operands, instruction):
+        return None, None
 
+    def exec_invalid(self, program_counter, operands, instruction):
+        print("DECODE - ERROR: Invalid instruction at program counter: ", program_counter)
+        return program_counter + 1, None
+
+    # ----- VECTOR ARITHMETIC OPERATIONS
+    def exec_vector_arithmetic(self, operation, scalar_operand, program_counter, operands, instruction):
+        # --- DECODE ---
+        destination_reg_idx, operand1_reg_idx, operand2_reg_idx = operands
+        # --- EXECUTE ---
+        vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
+        if vector1 is None:
+            return None
+        if scalar_operand:
+            scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
+            if scalar2 == None:
+                return None
+            vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
+        else:
+            vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
+            if vector2 is None:
+                return None
+        result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
+        for i in self.SRs["VM"].enabled_elements(self.SRs["VL"].Read(0)[0]):
+            # TODO - Check Divide by zero condition
+            result[i] = operation(vector1[i], vector2[i])
+        # --- WRITEBACK ---
+        write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
+        if write_result is None:
+            return None
+        return program_counter + 1, None
+
+    def exec_vector_arithmetic_numpy(self, operation, scalar_operand, program_counter, operands, instruction):
+        # Same as exec_vector_arithmetic, on whole vectors - only the elements enabled by the mask within VL are computed
+        # --- DECODE ---
+        destination_reg_idx, operand1_reg_idx, operand2_reg_idx = operands
+        # --- EXECUTE ---
+        vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
+        if vector1 is None:
+            return None
+        if scalar_operand:
+            scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
+            if scalar2 == None:
+                return None
+            vector2 = np.full(self.RFs["VRF"].vec_length, scalar2[0], dtype=np.int64)
+        else:
+            vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
+            if vector2 is None:
+                return None
+        active = self.active_elements()
+        if operation is operator.floordiv and not vector2[active].all():
+            # Matching the list backend, which fails on the first division by zero
+            raise ZeroDivisionError("integer division or modulo by zero")
+        result = np.zeros(self.RFs["VRF"].vec_length, dtype=np.int64)
+        result[active] = operation(vector1[active], vector2[active])
+        # --- WRITEBACK ---
+        write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
+        if write_result is None:
+            return None
+        return program_counter + 1, None
+
+    def active_elements(self):
+        # Boolean array of the elements enabled by the vector mask register, within the vector length
+        active = self.SRs["VM"].as_array().copy()
+        active[self.SRs["VL"].Read(0)[0]:] = False
+        return active
+
+    # ----- VECTOR MASK REGISTER OPERATIONS
+    def exec_vector_compare(self, comparison, scalar_operand, program_counter, operands, instruction):
+        # --- DECODE ---
+        operand1_reg_idx, operand2_reg_idx = operands
+        # --- EXECUTE ---
+        vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
+        if vector1 is None:
+            return None
+        if scalar_operand:
+            scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
+            if scalar2 == None:
+                return None
+            vector2 = [scalar2[0] for _ in range(self.RFs["VRF"].vec_length)]
+        else:
+            vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
+            if vector2 is None:
+                return None
+        vector_length = self.SRs["VL"].Read(0)[0]
+        if self.backend == "numpy":
+            result = np.zeros(self.RFs["VRF"].vec_length, dtype=bool)
+            result[:vector_length] = comparison(vector1[:vector_length], vector2[:vector_length])
+            # --- WRITEBACK ---
+            self.SRs["VM"].write_bits(result)
+            return program_counter + 1, None
+        element_bits = self.SRs["VM"].element_bits
+        vector_mask_value = 0
+        for i in range(vector_length):
+            if comparison(vector1[i], vector2[i]):
+                vector_mask_value |= element_bits[i]
+        # --- WRITEBACK ---
+        self.SRs["VM"].Write(0, [vector_mask_value])
+        return program_counter + 1, None
+
+    def exec_cvm(self, program_counter, operands, instruction):
+        # --- EXECUTE : CVM --- 
+        self.SRs["VM"].Write(0, [self.SRs["VM"].all_ones])
+        return program_counter + 1, None
+
+    def exec_pop(self, program_counter, operands, instruction):
+        # --- DECODE : POP ---
+        destination_reg_idx = operands
+        # --- EXECUTE : POP --- 
+        count = self.SRs["VM"].popcount()
+        if count <= self.SRs["VM"].reg_bits:
+            write_result = self.RFs["SRF"].Write(destination_reg_idx, [count])
+            if write_result == None:
+                return None
+        else:
+            print("WARNING: Invalid number popped, debug code!")
+            self.RFs["SRF"].Write(destination_reg_idx, [self.SRs["VM"].reg_bits])
+        return program_counter + 1, None
+
+    # ----- VECTOR LENGTH REGISTER OPERATIONS
+    def exec_mtcl(self, program_counter, operands, instruction):
+        # --- DECODE : MTCL ---
+        operand_reg_idx = operands
+        # --- EXECUTE : MTCL --- 
+        value = self.RFs["SRF"].Read(operand_reg_idx)
+        if value == None:
+            return None
+        value = value[0]
+        if value <= self.RFs["VRF"].vec_length:
+            self.SRs["VL"].Write(0, [value])
+            return program_counter + 1, (instruction[0], tuple(instruction[1:]), None, value)
+        print("WARNING: Invalid Value for Vector Length Register, debug code!")
+        return program_counter + 1, None
+
+    def exec_mfcl(self, program_counter, operands, instruction):
+        # --- DECODE : MFCL ---
+        operand_reg_idx = operands
+        # --- EXECUTE : MFCL --- 
+        self.RFs["SRF"].Write(operand_reg_idx, list(self.SRs["VL"].Read(0)))
+        return program_counter + 1, None
+
+    # ----- MEMORY ACCESS OPERATIONS
+    def vector_load(self, destination_reg_idx, element_addresses):
+        # Loads the element addresses into the destination register, returns the accessed addresses or None on error
+        addresses = []
+        result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
+        for i, address in enumerate(element_addresses):
+            data = self.VDMEM.Read(address)
+            if data != None:
+                result[i] = data
+                addresses.append(address)
             else:
-                print("DECODE - ERROR: Invalid instruction at program counter: ", program_counter)
+                result[i] = 0
+                print("WARNING: Reading from Invalid Memory Address, debug code!")
+        write_result = self.RFs["VRF"].Write(destination_reg_idx, result)
+        if write_result is None:
+            return None
+        return addresses
+
+    def vector_store(self, vector1, element_addresses):
+        # Stores the vector at the element addresses, returns the accessed addresses
+        addresses = []
+        for i, address in enumerate(element_addresses):
+            write_result = self.VDMEM.Write(address, int(vector1[i]))
+            addresses.append(address)
+            if write_result == None:
+                print("WARNING: Trying to write on an Invalid Memory Address, debug code!")
+        return addresses
+
+    def exec_lv(self, program_counter, operands, instruction):
+        ### --- DECODE : LV ---
+        destination_reg_idx, operand1_reg_idx = operands
+        ### --- EXECUTE : LV ---
+        memory_address = self.RFs["SRF"].Read(operand1_reg_idx)
+        if memory_address == None:
+            return None
+        memory_address = memory_address[0]
+        addresses = self.vector_load(destination_reg_idx, [memory_address + i for i in range(self.SRs["VL"].Read(0)[0])])
+        if addresses == None:
+            return None
+        return program_counter + 1, (instruction[0], tuple(instruction[1:-1]), pack_addresses(addresses), None)
 
-            program_counter += 1
-            imem.resolved_program.append(str(" ".join(current_instruction_print)))
-            print("")
+    def exec_sv(self, program_counter, operands, instruction):
+        ### --- DECODE : SV ---
+        destination_reg_idx, operand1_reg_idx = operands
+        ### --- EXECUTE : SV ---
+        memory_address = self.RFs["SRF"].Read(operand1_reg_idx)
+        if memory_address == None:
+            return None
+        memory_address = memory_address[0]
+        vector1 = self.RFs["VRF"].Read(destination_reg_idx)
+        if vector1 is None:
+            return None
+        addresses = self.vector_store(vector1, [memory_address + i for i in range(self.SRs["VL"].Read(0)[0])])
+        return program_counter + 1, (instruction[0], tuple(instruction[1:-1]), pack_addresses(addresses), None)
+
+    def exec_lvws(self, program_counter, operands, instruction):
+        ### --- DECODE : LVWS ---
+        destination_reg_idx, operand1_reg_idx, operand2_reg_idx = operands
+        ### --- EXECUTE : LVWS ---
+        memory_address = self.RFs["SRF"].Read(operand1_reg_idx)
+        if memory_address == None:
+            return None
+        memory_address = memory_address[0]
+        stride = self.RFs["SRF"].Read(operand2_reg_idx)
+        if stride == None:
+            return None
+        stride = stride[0]
+        addresses = self.vector_load(destination_reg_idx, [memory_address + (i * stride) for i in range(self.SRs["VL"].Read(0)[0])])
+        if addresses == None:
+            return None
+        return program_counter + 1, (instruction[0], tuple(instruction[1:-2]), pack_addresses(addresses), None)
+
+    def exec_svws(self, program_counter, operands, instruction):
+        ### --- DECODE : SVWS ---
+        destination_reg_idx, operand1_reg_idx, operand2_reg_idx = operands
+        ### --- EXECUTE : SVWS ---
+        memory_address = self.RFs["SRF"].Read(operand1_reg_idx)
+        if memory_address == None:
+            return None
+        memory_address = memory_address[0]
+        stride = self.RFs["SRF"].Read(operand2_reg_idx)
+        if stride == None:
+            return None
+        stride = stride[0]
+        vector1 = self.RFs["VRF"].Read(destination_reg_idx)
+        if vector1 is None:
+            return None
+        addresses = self.vector_store(vector1, [memory_address + (i * stride) for i in range(self.SRs["VL"].Read(0)[0])])
+        return program_counter + 1, (instruction[0], tuple(instruction[1:-2]), pack_addresses(addresses), None)
+
+    def exec_lvi(self, program_counter, operands, instruction):
+        ### --- DECODE : LVI ---
+        destination_reg_idx, operand1_reg_idx, operand2_reg_idx = operands
+        ### --- EXECUTE : LVI ---
+        base_address = self.RFs["SRF"].Read(operand1_reg_idx)
+        if base_address == None:
+            return None
+        base_address = base_address[0]
+        offsets = self.RFs["VRF"].Read(operand2_reg_idx)
+        if offsets is None:
+            return None
+        addresses = self.vector_load(destination_reg_idx, [base_address + int(offsets[i]) for i in range(self.SRs["VL"].Read(0)[0])])
+        if addresses == None:
+            return None
+        return program_counter + 1, (instruction[0], tuple(instruction[1:-2]), pack_addresses(addresses), None)
+
+    def exec_svi(self, program_counter, operands, instruction):
+        ### --- DECODE : SVI ---
+        destination_reg_idx, operand1_reg_idx, operand2_reg_idx = operands
+        ### --- EXECUTE : SVI ---
+        base_address = self.RFs["SRF"].Read(operand1_reg_idx)
+        if base_address == None:
+            return None
+        base_address = base_address[0]
+        offsets = self.RFs["VRF"].Read(operand2_reg_idx)
+        if offsets is None:
+            return None
+        vector1 = self.RFs["VRF"].Read(destination_reg_idx)
+        if vector1 is None:
+            return None
+        addresses = self.vector_store(vector1, [base_address + int(offsets[i]) for i in range(self.SRs["VL"].Read(0)[0])])
+        return program_counter + 1, (instruction[0], tuple(instruction[1:-2]), pack_addresses(addresses), None)
+
+    def exec_ls(self, program_counter, operands, instruction):
+        # --- DECODE : LS ---
+        destination_reg_idx, operand1_reg_idx, imm = operands
+        # --- EXECUTE : LS ---
+        scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
+        if scalar1 == None:
+            return None
+        scalar1 = scalar1[0]
+        memory_address = scalar1 + imm
+        data = self.SDMEM.Read(memory_address)
+        if data == None:
+            return None
+        write_result = self.RFs["SRF"].Write(destination_reg_idx, [data])
+        if write_result == None:
+            return None
+        return program_counter + 1, (instruction[0], tuple(instruction[1:-2]), memory_address, None)
+
+    def exec_ss(self, program_counter, operands, instruction):
+        # --- DECODE : SS ---
+        operand1_reg_idx, operand2_reg_idx, imm = operands
+        # --- EXECUTE : SS ---
+        data = self.RFs["SRF"].Read(operand1_reg_idx)
+        if data == None:
+            return None
+        data = data[0]
+        scalar1 = self.RFs["SRF"].Read(operand2_reg_idx)
+        if scalar1 == None:
+            return None
+        scalar1 = scalar1[0]
+        memory_address = scalar1 + imm
+        write_result = self.SDMEM.Write(memory_address, data)
+        if write_result == None:
+            print("WARNING: Trying to write on an Invalid Memory Address, debug code!")
+        return program_counter + 1, (instruction[0], tuple(instruction[1:-2]), memory_address, None)
+
+    # ----- SCALAR OPERATIONS
+    def exec_scalar(self, operation, program_counter, operands, instruction):
+        # --- DECODE ---
+        destination_reg_idx, operand1_reg_idx, operand2_reg_idx = operands
+        # --- EXECUTE ---
+        scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
+        if scalar1 == None:
+            return None
+        scalar1 = scalar1[0]
+        scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
+        if scalar2 == None:
+            return None
+        scalar2 = scalar2[0]
+        result = operation(scalar1, scalar2, self.RFs["SRF"].reg_bits)
+        self.RFs["SRF"].Write(destination_reg_idx, [result])
+        return program_counter + 1, None
+
+    # ----- CONTROL OPERATIONS
+    def exec_branch(self, comparison, program_counter, operands, instruction):
+        # --- DECODE ---
+        operand1_reg_idx, operand2_reg_idx, imm = operands
+        # --- EXECUTE ---
+        scalar1 = self.RFs["SRF"].Read(operand1_reg_idx)
+        if scalar1 == None:
+            return None
+        scalar1 = scalar1[0]
+        scalar2 = self.RFs["SRF"].Read(operand2_reg_idx)
+        if scalar2 == None:
+            return None
+        scalar2 = scalar2[0]
+        if comparison(scalar1, scalar2):
+            program_counter = program_counter + imm
+        else:
+            program_counter = program_counter + 1
+        return program_counter, ("B", (), program_counter, None)
+
+    # ----- REGISTER-REGISTER SHUFFLE
+    def read_shuffle_operands(self, operands):
+        destination_reg_idx, operand1_reg_idx, operand2_reg_idx = operands
+        vector1 = self.RFs["VRF"].Read(operand1_reg_idx)
+        if vector1 is None:
+            return None
+        vector2 = self.RFs["VRF"].Read(operand2_reg_idx)
+        if vector2 is None:
+            return None
+        return destination_reg_idx, vector1, vector2
+
+    def exec_unpacklo(self, program_counter, operands, instruction):
+        # --- DECODE : UNPACKLO ---
+        shuffle_operands = self.read_shuffle_operands(operands)
+        if shuffle_operands == None:
+            return None
+        destination_reg_idx, vector1, vector2 = shuffle_operands
+        # --- EXECUTE : UNPACKLO ---
+        result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
+        j = 0
+        for i in range(0, self.SRs["VL"].Read(0)[0] // 2):
+            result[j] = vector1[i]
+            result[j+1] = vector2[i]
+            j += 2
+        # --- WRITEBACK : UNPACKLO ---
+        self.RFs["VRF"].Write(destination_reg_idx, result)
+        return program_counter + 1, None
+
+    def exec_unpackhi(self, program_counter, operands, instruction):
+        # --- DECODE : UNPACKHI ---
+        shuffle_operands = self.read_shuffle_operands(operands)
+        if shuffle_operands == None:
+            return None
+        destination_reg_idx, vector1, vector2 = shuffle_operands
+        # --- EXECUTE : UNPACKHI ---
+        result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
+        j = 0
+        for i in range(self.SRs["VL"].Read(0)[0] // 2, self.SRs["VL"].Read(0)[0]):
+            result[j] = vector1[i]
+            result[j+1] = vector2[i]
+            j += 2
+        # --- WRITEBACK : UNPACKHI ---
+        self.RFs["VRF"].Write(destination_reg_idx, result)
+        return program_counter + 1, None
+
+    def exec_packlo(self, program_counter, operands, instruction):
+        # --- DECODE : PACKLO ---
+        shuffle_operands = self.read_shuffle_operands(operands)
+        if shuffle_operands == None:
+            return None
+        destination_reg_idx, vector1, vector2 = shuffle_operands
+        # --- EXECUTE : PACKLO ---
+        result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
+        j = 0
+        mvl = self.SRs["VL"].Read(0)[0]
+        for i in range(0, mvl, 2):
+            result[j] = vector1[i]
+            result[(mvl // 2) + j] = vector2[i]
+            j += 1
+        # --- WRITEBACK : PACKLO ---
+        self.RFs["VRF"].Write(destination_reg_idx, result)
+        return program_counter + 1, None
+
+    def exec_packhi(self, program_counter, operands, instruction):
+        # --- DECODE : PACKHI ---
+        shuffle_operands = self.read_shuffle_operands(operands)
+        if shuffle_operands == None:
+            return None
+        destination_reg_idx, vector1, vector2 = shuffle_operands
+        # --- EXECUTE : PACKHI ---
+        result = [0x0 for e in range(self.RFs["VRF"].vec_length)]
+        j = 0
+        mvl = self.SRs["VL"].Read(0)[0]
+        for i in range(1, mvl, 2):
+            result[j] = vector1[i]
+            result[(mvl // 2) + j] = vector2[i]
+            j += 1
+        # --- WRITEBACK : PACKHI ---
+        self.RFs["VRF"].Write(destination_reg_idx, result)
+        return program_counter + 1, None
+
+    def input_digest(self):
+        return input_digest([self.IMEM.filepath, self.SDMEM.sourcepath, self.VDMEM.sourcepath])
+
+    def save_checkpoint(self, filepath):
+        # Writes the architectural state, see rrm9598_avm6288_checkpoint
+        state = {"count": self.instruction_count,
+                 "pc": self.program_counter,
+                 "digest": self.input_digest(),
+                 "VL": self.SRs["VL"].Read(0)[0],
+                 "VM": self.SRs["VM"].Read(0)[0],
+                 "SRF": [[int(val) for val in self.RFs["SRF"].Read(idx)] for idx in range(self.RFs["SRF"].reg_count)],
+                 "VRF": [[int(val) for val in self.RFs["VRF"].Read(idx)] for idx in range(self.RFs["VRF"].reg_count)],
+                 "memories": {"SDMEM": memory_runs(self.SDMEM.data, self.SDMEM.touched),
+                              "VDMEM": memory_runs(self.VDMEM.data, self.VDMEM.touched)},
+                 "trace": self.IMEM.resolved_program}
+        try:
+            write_checkpoint(filepath, state)
+            print("Core - Checkpoint at instruction", self.instruction_count, "written to:", filepath)
+        except OSError:
+            print("Core - ERROR: Couldn't write checkpoint in path:", filepath)
+
+    def restore_checkpoint(self, filepath):
+        # Restores the architectural state written by save_checkpoint, on top of the freshly loaded inputs
+        state = read_checkpoint(filepath)
+        if state["digest"] != self.input_digest():
+            print("Core - ERROR: Checkpoint was taken with different input files:", filepath)
+            raise ValueError(filepath)
+        self.instruction_count = state["count"]
+        self.program_counter = state["pc"]
+        self.SRs["VL"].Write(0, [state["VL"]])
+        self.SRs["VM"].Write(0, [state["VM"]])
+        for name in ["SRF", "VRF"]:
+            for idx, words in enumerate(state[name]):
+                self.RFs[name].Write(idx, words)
+        for dmem in [self.SDMEM, self.VDMEM]:
+            for start, words in state["memories"][dmem.name]:
+                dmem.data[start:start + len(words)] = words
+                dmem.touched.update(range(start, start + len(words)))
+        self.IMEM.resolved_program = state["trace"]
+        print("Core - Restored checkpoint at instruction", self.instruction_count, "from:", filepath)
 
     def dumpregs(self, iodir):
         for rf in self.RFs.values():
@@ -1241,28 +1012,46 @@ if __name__ == "__main__":
     #parse arguments for input file location
     parser = argparse.ArgumentParser(description='Vector Core Performance Model')
     parser.add_argument('--iodir', default="", type=str, help='Path to the folder containing the input files - instructions and data.')
+    parser.add_argument('--memin', default="text", choices=["text", "binary"], help='Load data memories from text files (SDMEM.txt/VDMEM.txt) or binary images (SDMEM.bin/VDMEM.bin)')
+    parser.add_argument('--memout', default="text", choices=["text", "sparse", "binary"], help='Dump data memories as full text files, text files with only the loaded and written ranges, or binary images (SDMEMOP.bin/VDMEMOP.bin)')
+    parser.add_argument('--traceout', default="text", choices=["text", "binary"], help='Dump the resolved code flow as text (Resolved_Code.txt) or as a binary trace (Resolved_Code.bin)')
+    parser.add_argument('--cache', action='store_true', help='Cache the parsed inputs in .simcache in the IO directory, keyed by a hash of the input files')
+    parser.add_argument('--backend', default="list", choices=["list", "numpy"], help='Execution backend for the vector register file and vector arithmetic')
+    parser.add_argument('--checkpoint', default=[], type=int, nargs='+', help='Write a checkpoint of the architectural state after each of these dynamic instruction counts (checkpoint_<count>.ckpt)')
+    parser.add_argument('--restore', default=None, type=str, help='Resume from a checkpoint file instead of starting from the first instruction')
     args = parser.parse_args()
+    if args.backend == "numpy" and np is None:
+        parser.error("--backend numpy requires NumPy to be installed")
 
     iodir = os.path.abspath(args.iodir)
     print("IO Directory:", iodir)
 
+    cache = SimCache(iodir) if args.cache else None
+
     # Parse IMEM
-    imem = IMEM(iodir)  
+    imem = IMEM(iodir, cache)  
     # Parse SMEM
-    sdmem = DMEM("SDMEM", iodir, 13) # 32 KB is 2^15 bytes = 2^13 K 32-bit words.
+    sdmem = DMEM("SDMEM", iodir, 13, args.memin == "binary", cache) # 32 KB is 2^15 bytes = 2^13 K 32-bit words.
     # Parse VMEM
-    vdmem = DMEM("VDMEM", iodir, 17) # 512 KB is 2^19 bytes = 2^17 K 32-bit words. 
+    vdmem = DMEM("VDMEM", iodir, 17, args.memin == "binary", cache) # 512 KB is 2^19 bytes = 2^17 K 32-bit words. 
 
     # Create Vector Core
-    vcore = Core(imem, sdmem, vdmem)
+    vcore = Core(imem, sdmem, vdmem, args.backend)
+    vcore.checkpoints = {count: os.path.join(iodir, "checkpoint_{}.ckpt".format(count)) for count in args.checkpoint}
+    if args.restore is not None:
+        vcore.restore_checkpoint(args.restore)
 
     # Run Core
     vcore.run()
     print("")   
     vcore.dumpregs(iodir)
 
-    sdmem.dump()
-    vdmem.dump()
-    imem.dump()
+    if args.memout == "binary":
+        sdmem.dump_image()
+        vdmem.dump_image()
+    else:
+        sdmem.dump(args.memout == "sparse")
+        vdmem.dump(args.memout == "sparse")
+    imem.dump(args.traceout == "binary")
 
     # THE END
\ No newline at end of file
@@ -0,0 +1,161 @@
+# -------------------------------------------------------------
+# Title   : Vector Processor - Regression Runner
+# Authors : Rugved Mhatre (rrm9598), Akshath Mahajan (avm6288)
+# -------------------------------------------------------------
+
+# Runs the functional simulator and then the timing simulator on every test case, in parallel, and compares the
+# outputs against the golden outputs stored in the test case folder. Each case runs in a scratch copy of its inputs,
+# so the golden files are only written with --update.
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import subprocess
+from concurrent.futures import ProcessPoolExecutor
+
+from rrm9598_avm6288_timingsimulator import check_strided_bank_cycles
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+FUNCSIMULATOR = os.path.join(ROOT, "rrm9598_avm6288_funcsimulator.py")
+TIMINGSIMULATOR = os.path.join(ROOT, "rrm9598_avm6288_timingsimulator.py")
+
+INPUT_FILES = ["Code.asm", "Config.txt", "SDMEM.txt", "VDMEM.txt"]
+# Functional outputs compared as they are written
+GOLDEN_FILES = ["VDMEMOP.txt", "SRF.txt", "VRF.txt"]
+RESULT_FILE = "result.txt"
+TIMING_DIAGRAM_FILE = "timing_diagram.csv"
+
+def find_cases(testdir):
+    # Every folder with a Code.asm under testdir
+    cases = []
+    for name in sorted(os.listdir(testdir)):
+        path = os.path.join(testdir, name)
+        if os.path.isdir(path) and os.path.isfile(os.path.join(path, "Code.asm")):
+            cases.append(path)
+    return cases
+
+def read_cycles(path):
+    # "Total cycles: 78" -> 78, None if the file is missing or malformed
+    try:
+        with open(path, 'r') as f:
+            return int(f.read().split(":")[1])
+    except (OSError, IndexError, ValueError):
+        return None
+
+def read_config(path):
+    with open(path, 'r') as conf:
+        return {line.split('=')[0].strip(): int(line.split('=')[1].split('#')[0].strip()) for line in conf.readlines() if not (line.startswith('#') or line.strip() == '')}
+
+def same_file(path_a, path_b):
+    if not (os.path.isfile(path_a) and os.path.isfile(path_b)):
+        return False
+    if os.path.getsize(path_a) != os.path.getsize(path_b):
+        return False
+    with open(path_a, 'rb') as a, open(path_b, 'rb') as b:
+        while True:
+            chunk_a = a.read(1 << 20)
+            if chunk_a != b.read(1 << 20):
+                return False
+            if not chunk_a:
+                return True
+
+def run_simulator(script, workdir, extra_args):
+    # Returns (wall time, error message or None)
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, script, "--iodir", workdir] + extra_args, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True)
+    elapsed = time.perf_counter() - start
+    if proc.returncode != 0:
+        return elapsed, proc.stdout.strip().splitlines()[-1] if proc.stdout.strip() else "exit code " + str(proc.returncode)
+    return elapsed, None
+
+def run_case(case, timing_args, update):
+    # Runs one test case in a scratch folder, returns a result dictionary
+    name = os.path.basename(case)
+    result = {"name": name, "func_time": 0.0, "timing_time": 0.0, "cycles": None, "golden_cycles": read_cycles(os.path.join(case, RESULT_FILE)), "mismatches": [], "error": None}
+    # The timing diagram is only written and compared for cases with a golden diagram - conv and FCC diagrams run into GBs
+    with_diagram = os.path.isfile(os.path.join(case, TIMING_DIAGRAM_FILE))
+
+    workdir = tempfile.mkdtemp(prefix="vmips_" + name + "_")
+    try:
+        for filename in INPUT_FILES:
+            if os.path.isfile(os.path.join(case, filename)):
+                shutil.copy(os.path.join(case, filename), workdir)
+
+        result["func_time"], result["error"] = run_simulator(FUNCSIMULATOR, workdir, [])
+        if result["error"] is not None:
+            return result
+        result["timing_time"], result["error"] = run_simulator(TIMINGSIMULATOR, workdir, timing_args + (["--timing", "Y"] if with_diagram else []))
+        if result["error"] is not None:
+            return result
+
+        result["cycles"] = read_cycles(os.path.join(workdir, RESULT_FILE))
+        outputs = {filename: os.path.join(workdir, filename) for filename in GOLDEN_FILES + [RESULT_FILE]}
+        if with_diagram:
+            depth = read_config(os.path.join(workdir, "Config.txt"))["computeQueueDepth"]
+            outputs[TIMING_DIAGRAM_FILE] = os.path.join(workdir, "timing_diagram_{}.csv".format(depth))
+
+        for filename, output in outputs.items():
+            golden = os.path.join(case, filename)
+            if filename == RESULT_FILE:
+                matches = result["cycles"] is not None and result["cycles"] == result["golden_cycles"]
+            else:
+                matches = same_file(output, golden)
+            if not matches:
+                result["mismatches"].append(filename)
+                if update and os.path.isfile(output):
+                    shutil.copy(output, golden)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return result
+
+def print_report(results, total_time):
+    print("")
+    print("{:<26}{:<8}{:>10}{:>10}{:>10}{:>10}  {}".format("Test", "Status", "Cycles", "Golden", "Func(s)", "Timing(s)", "Mismatches"))
+    print("-" * 100)
+    for result in results:
+        if result["error"] is not None:
+            status = "ERROR"
+        elif result["mismatches"]:
+            status = "FAIL"
+        else:
+            status = "PASS"
+        details = result["error"] if result["error"] is not None else ", ".join(result["mismatches"])
+        print("{:<26}{:<8}{:>10}{:>10}{:>10.2f}{:>10.2f}  {}".format(result["name"], status, str(result["cycles"]), str(result["golden_cycles"]), result["func_time"], result["timing_time"], details))
+    print("-" * 100)
+    n_passed = sum([1 for result in results if result["error"] is None and not result["mismatches"]])
+    print("Passed: {}/{}, wall time: {:.2f}s".format(n_passed, len(results), total_time))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Vector Core Regression Runner')
+    parser.add_argument('--testdir', default=os.path.join(ROOT, "test_cases"), type=str, help='Path to the folder containing the test case folders')
+    parser.add_argument('--tests', nargs='*', default=None, help='Names of the test cases to run (default: all)')
+    parser.add_argument('--jobs', default=os.cpu_count(), type=int, help='Number of test cases run in parallel')
+    parser.add_argument('--engine', default="cycle", choices=["cycle", "event"], help='Timing simulator engine')
+    parser.add_argument('--extrapolate', default="off", choices=["off", "on", "verify"], help='Steady-state loop extrapolation in the timing simulator (not used for cases with a golden timing diagram)')
+    parser.add_argument('--update', action='store_true', help='Overwrite mismatching golden outputs with the new outputs')
+    parser.add_argument('--check-banks', action='store_true', help='Also check the closed form of the strided load/store bank cycles against the bank simulation')
+    args = parser.parse_args()
+
+    bank_mismatches = []
+    if args.check_banks:
+        bank_mismatches = check_strided_bank_cycles()
+        for stride, count, n_banks, bank_busy_time, closed, simulated in bank_mismatches[:10]:
+            print("Bank cycles mismatch - stride {}, {} addresses, {} banks, busy time {}: closed form {}, simulated {}".format(stride, count, n_banks, bank_busy_time, closed, simulated))
+        print("Bank cycles: {} strided patterns disagree with the bank simulation".format(len(bank_mismatches)))
+
+    cases = find_cases(os.path.abspath(args.testdir))
+    if args.tests:
+        cases = [case for case in cases if os.path.basename(case) in args.tests]
+    print("Running", len(cases), "test cases on", args.jobs, "workers")
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(args.jobs, 1)) as pool:
+        results = list(pool.map(run_case, cases, [["--engine", args.engine, "--extrapolate", args.extrapolate]] * len(cases), [args.update] * len(cases)))
+    print_report(results, time.perf_counter() - start)
+
+    sys.exit(0 if not bank_mismatches and all(result["error"] is None and not result["mismatches"] for result in results) else 1)
+
+    # THE END
@@ -0,0 +1,151 @@
+# -------------------------------------------------------------
+# Title   : Vector Processor - Design Space Sweep
+# Authors : Rugved Mhatre (rrm9598), Akshath Mahajan (avm6288)
+# -------------------------------------------------------------
+
+# Runs the timing model over a grid (or a random sample of a grid) of Config.txt parameters. The resolved code is
+# parsed once and handed to the worker processes read-only, each worker runs one configuration at a time. The results
+# table marks the Pareto front of total cycles vs hardware cost.
+
+import os
+import io
+import copy
+import time
+import random
+import argparse
+import itertools
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+
+import csv
+
+from rrm9598_avm6288_trace import read_resolved, read_trace
+from rrm9598_avm6288_timingsimulator import Config, Core, Sampler, StreamIMEM
+from rrm9598_avm6288_cache import SimCache
+from rrm9598_avm6288_analytical import estimate_cycles
+
+# Relative hardware cost of one unit of each resource parameter. Latency parameters (bank busy time, pipeline depths)
+# do not add to the cost.
+COST_WEIGHTS = {
+    "numLanes": 16,         # one lane of every vector pipeline
+    "vdmNumBanks": 4,       # one memory bank
+    "dataQueueDepth": 1,    # one VDQ entry
+    "computeQueueDepth": 2, # one VCQ and one SCQ entry
+}
+
+# Resolved code records, set in each worker by init_worker
+records = None
+
+def hardware_cost(parameters: dict):
+    return sum([weight * parameters[name] for name, weight in COST_WEIGHTS.items()])
+
+def parse_grid(specs: list):
+    # ["numLanes=2,4,8", "vdmNumBanks=8,16"] -> {"numLanes": [2, 4, 8], "vdmNumBanks": [8, 16]}
+    grid = {}
+    for spec in specs:
+        name, values = spec.split("=")
+        grid[name.strip()] = [int(value) for value in values.split(",")]
+    return grid
+
+def sweep_points(grid: dict, samples = None, seed = 0):
+    # All combinations of the grid values, or `samples` of them picked at random
+    names = sorted(grid.keys())
+    points = [dict(zip(names, values)) for values in itertools.product(*[grid[name] for name in names])]
+    if samples is not None and samples < len(points):
+        points = random.Random(seed).sample(points, samples)
+    return points
+
+def pareto_front(results: list):
+    # Indices of the results not dominated in (cycles, cost) - no other result is as good in both and better in one
+    front = []
+    best_cycles = None
+    for idx in sorted(range(len(results)), key=lambda idx: (results[idx]["cost"], results[idx]["cycles"])):
+        if best_cycles is None or results[idx]["cycles"] < best_cycles:
+            front.append(idx)
+            best_cycles = results[idx]["cycles"]
+    return front
+
+def init_worker(shared_records):
+    # With fork the records are inherited from the parent, not copied
+    global records
+    records = shared_records
+
+def run_point(base_config: Config, point: dict, engine: str, extrapolate: str, sampling):
+    config = copy.copy(base_config)
+    config.parameters = dict(base_config.parameters, **point)
+    start = time.perf_counter()
+    if engine == "analytical":
+        with contextlib.redirect_stdout(io.StringIO()):
+            cycles = estimate_cycles(records, config)
+        return {"cycles": cycles, "cost": hardware_cost(config.parameters), "time": time.perf_counter() - start}
+    # The timing model reads only the resolved code, the data memories are not needed
+    # sampling - (period, length, warmup, seed) of the statistical sampling mode, or None for exact runs
+    sampler = Sampler(*sampling) if sampling is not None else None
+    vcore = Core(StreamIMEM(records), None, None, config, engine, extrapolate=extrapolate, sampler=sampler)
+    with contextlib.redirect_stdout(io.StringIO()):
+        vcore.run()
+    return {"cycles": vcore.cycle, "cost": hardware_cost(config.parameters), "time": time.perf_counter() - start}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Vector Core Design Space Sweep')
+    parser.add_argument('--iodir', default="", type=str, help='Path to the folder containing Config.txt and the resolved code')
+    parser.add_argument('--param', action='append', default=[], help='Swept parameter and its values, e.g. --param numLanes=2,4,8 (repeatable)')
+    parser.add_argument('--samples', default=None, type=int, help='Run a random sample of this many grid points instead of the full grid')
+    parser.add_argument('--seed', default=0, type=int, help='Seed of the random sample of grid points, and of the sampled interval offsets')
+    parser.add_argument('--tracein', default="text", choices=["text", "binary"], help='Load the resolved code flow from text (Resolved_Code.txt) or a binary trace (Resolved_Code.bin)')
+    parser.add_argument('--cache', action='store_true', help='Cache the parsed resolved code in .simcache in the IO directory, keyed by a hash of Resolved_Code.txt')
+    parser.add_argument('--engine', default="event", choices=["cycle", "event", "analytical"], help='Timing simulator engine, or the analytical estimate (rrm9598_avm6288_analytical) to prune the space quickly')
+    parser.add_argument('--extrapolate', default="off", choices=["off", "on"], help='Steady-state loop extrapolation in the timing model')
+    parser.add_argument('--sample', default=0, type=int, nargs='?', const=5000, help='Statistical sampling in the timing model - measure an interval every SAMPLE instructions (5000 if no value is given), fast-forward through the rest (0 disables sampling)')
+    parser.add_argument('--sample-length', default=200, type=int, help='Instructions measured in each sampled interval')
+    parser.add_argument('--sample-warmup', default=200, type=int, help='Instructions simulated in detail before each measured interval')
+    parser.add_argument('--jobs', default=os.cpu_count(), type=int, help='Number of configurations run in parallel')
+    parser.add_argument('--out', default="sweep_results.csv", type=str, help='Results table, written to the IO directory')
+    args = parser.parse_args()
+    if args.sample and args.sample <= args.sample_length + args.sample_warmup:
+        parser.error("--sample must be larger than --sample-length + --sample-warmup")
+    sampling = (args.sample, args.sample_length, args.sample_warmup, args.seed) if args.sample else None
+
+    iodir = os.path.abspath(args.iodir)
+    print("IO Directory:", iodir)
+    base_config = Config(iodir)
+
+    grid = parse_grid(args.param)
+    for name in grid:
+        if name not in base_config.parameters:
+            parser.error("unknown parameter: " + name)
+    points = sweep_points(grid, args.samples, args.seed)
+
+    # Parse the resolved code once for all configurations
+    if args.tracein == "binary":
+        shared_records = list(read_trace(os.path.join(iodir, "Resolved_Code.bin")))
+    elif args.cache:
+        tracepath = os.path.join(iodir, "Resolved_Code.txt")
+        shared_records = list(SimCache(iodir).records("Resolved_Code", [tracepath], lambda: read_resolved(tracepath)))
+    else:
+        shared_records = list(read_resolved(os.path.join(iodir, "Resolved_Code.txt")))
+    print("Sweep - {} resolved instructions, {} configurations, {} workers".format(len(shared_records), len(points), args.jobs))
+
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=max(args.jobs, 1), initializer=init_worker, initargs=(shared_records,)) as pool:
+        results = list(pool.map(run_point, [base_config] * len(points), points, [args.engine] * len(points), [args.extrapolate] * len(points), [sampling] * len(points)))
+    for point, result in zip(points, results):
+        result.update(point)
+    front = set(pareto_front(results))
+
+    names = sorted(grid.keys())
+    outpath = os.path.join(iodir, args.out)
+    with open(outpath, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+        writer.writerow(names + ["cycles", "cost", "pareto", "time"])
+        for idx, result in enumerate(results):
+            writer.writerow([result[name] for name in names] + [result["cycles"], result["cost"], "Y" if idx in front else "N", "{:.3f}".format(result["time"])])
+    print("Sweep - Results written to:", outpath)
+
+    print("")
+    print("Pareto front (cycles vs hardware cost):")
+    for idx in sorted(front, key=lambda idx: results[idx]["cost"]):
+        print(" cycles: {:>10}  cost: {:>6}  {}".format(results[idx]["cycles"], results[idx]["cost"], ", ".join(["{}={}".format(name, results[idx][name]) for name in names])))
+    print("Sweep - wall time: {:.2f}s".format(time.perf_counter() - start))
+
+    # THE END
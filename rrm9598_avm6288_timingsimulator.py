@@ -4,35 +4,213 @@
 # -------------------------------------------------------------
 
 import os
+import sys
+import mmap
+import random
+import hashlib
 import argparse
+from array import array
+from collections import deque, OrderedDict
+from math import gcd
+import functools
 
 import csv
+import json
+
+from rrm9598_avm6288_trace import format_resolved, read_resolved, read_trace, encode_record
+from rrm9598_avm6288_cache import SimCache
+from rrm9598_avm6288_checkpoint import write_timing_checkpoint, read_timing_checkpoint
 
 OPTIMIZE_READ_PORTS = False
 
-class TimingDiagramExporter:
-    def __init__(self, timing_diagram, instrs):
-        self.timing_diagram = timing_diagram
-        self.max_cols = max(max(row, key=lambda x: x[1])[1] for row in self.timing_diagram) + 1
-        self.max_rows = len(self.timing_diagram)
-        self.instrs   = instrs
+# Pipeline stages shown in the timing diagram
+STAGES = ["F", "D", "E"]
+STAGE_IDS = {stage: stage_id for stage_id, stage in enumerate(STAGES)}
+
+# Functional units - the FU number is also its bit in the FU busy board
+FU_NAMES = ["VectorLS", "VectorADD", "VectorMUL", "VectorDIV", "VectorSHUF", "ScalarU"]
+FU_VECTOR_LS, FU_VECTOR_ADD, FU_VECTOR_MUL, FU_VECTOR_DIV, FU_VECTOR_SHUF, FU_SCALAR = range(len(FU_NAMES))
+
+# Instructions which wait in the scalar unit for the older instructions to finish
+WAIT_INSTRS = {"HALT", "CVM", "MTCL"}
+
+# Register operands are packed into an int - register index << 1 | 1 for VRn, 0 for SRn.
+# NO_REGISTER stands for the missing destination of the vector compare instructions.
+NO_REGISTER = -1
+
+def scalar_operand(index: int):
+    return index << 1
+
+def vector_operand(index: int):
+    return (index << 1) | 1
+
+def operand_name(operand):
+    # Packed register operand -> "VR3" / "SR1", "-" for NO_REGISTER
+    if operand == NO_REGISTER:
+        return "-"
+    return ("VR" if operand & 1 else "SR") + str(operand >> 1)
+
+# Stall causes charged by the StallProfiler
+STALL_QUEUE_FULL = "queue full"               # decoded, the dispatch queue is full
+STALL_QUEUE_ORDER = "queue order"             # in a dispatch queue, behind an older instruction
+STALL_FU_BUSY = "FU busy"                     # head of its queue, the FU is busy
+STALL_OPERAND = "operand in flight"           # head of its queue, an older in-flight instruction uses one of its registers
+STALL_WAIT = "wait serialization"             # behind a HALT/CVM/MTCL, or a HALT/CVM/MTCL waiting for the older vector instructions
+STALL_BANK_CONFLICT = "bank conflict"         # load/store cycles above a conflict-free access of the same length
+STALL_CAUSES = [STALL_QUEUE_FULL, STALL_QUEUE_ORDER, STALL_FU_BUSY, STALL_OPERAND, STALL_WAIT, STALL_BANK_CONFLICT]
+
+# Two-sided 95% Student's t quantiles for 1 to 30 degrees of freedom, the normal quantile 1.96 above
+T_QUANTILES_95 = [12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+                  2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+                  2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042]
+
+class TimingRow(object):
+    # Timing diagram row of one instruction, stored as stage intervals - a flat array of (stage id, first cycle, last cycle).
+    # Entries must come in cycle order. As in the per-cycle diagram, a later entry for the same cycle replaces the earlier one.
+    # queue / dispatched - dispatch queue and the cycle the instruction entered it, unit / issued - FU and the cycle it was issued
+    __slots__ = ["intervals", "queue", "dispatched", "unit", "issued"]
+
+    def __init__(self, stage, cycle):
+        self.intervals = array('i', (STAGE_IDS[stage], cycle, cycle))
+        self.queue = None
+        self.dispatched = None
+        self.unit = None
+        self.issued = None
+
+    def append(self, entry): # entry = (stage, cycle)
+        self.add_range(entry[0], entry[1], entry[1])
+
+    def add_range(self, stage, start, end):
+        intervals = self.intervals
+        stage_id = STAGE_IDS[stage]
+        if intervals and start <= intervals[-1]:
+            if intervals[-3] == stage_id:
+                intervals[-1] = max(intervals[-1], end)
+                return
+            if start <= intervals[-2]:
+                del intervals[-3:]
+            else:
+                intervals[-1] = start - 1
+        if intervals and intervals[-3] == stage_id and intervals[-1] == start - 1:
+            intervals[-1] = end
+        else:
+            intervals.extend((stage_id, start, end))
+
+    def last_cycle(self):
+        return self.intervals[-1]
+
+    def spans(self): # (stage, first cycle, last cycle)
+        intervals = self.intervals
+        return [(STAGES[intervals[i]], intervals[i + 1], intervals[i + 2]) for i in range(0, len(intervals), 3)]
+
+class TimingDiagram(object):
+    # Timing diagram rows of the instructions between fetch and retirement - timing_diagram[instr_idx] is a TimingRow. Retired rows are handed to the sink in program order, or dropped if there is no sink,
+    # so memory holds only the in-flight window instead of the whole trace.
+    def __init__(self, sink = None):
+        self.sink = sink
+        self.rows = deque() # [record, TimingRow, retired]
+        self.base = 0 # instr_idx of rows[0]
+        self.peak = 0 # most rows held at once
+
+    def __getitem__(self, idx):
+        return self.rows[idx - self.base][1]
+
+    def __len__(self): # instructions fetched so far
+        return self.base + len(self.rows)
+
+    def fetch(self, record, cycle):
+        self.rows.append([record, TimingRow("F", cycle), False])
+        if len(self.rows) > self.peak:
+            self.peak = len(self.rows)
+
+    def retire(self, idx):
+        self.rows[idx - self.base][2] = True
+        while self.rows and self.rows[0][2]:
+            self.release()
+
+    def release(self):
+        record, row, _ = self.rows.popleft()
+        if self.sink is not None:
+            self.sink.write(self.base, record, row)
+        self.base += 1
+
+    def shift(self, n):
+        # Renumbers the in-flight rows n instructions later (steady-state extrapolation, without a sink)
+        self.base += n
+
+    def flush(self, idx):
+        # Drops the in-flight rows, idx is the next instruction fetched (sampling fast-forward, without a sink)
+        self.rows.clear()
+        self.base = idx
+
+    def close(self):
+        # End of simulation - release all remaining rows
+        while self.rows:
+            self.release()
+        if self.sink is not None:
+            self.sink.close()
+
+def csv_field(value: str):
+    # Quotes a field the way csv.writer does by default
+    if any(c in value for c in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
 
-    def generate_excel(self, filename):
-        with open(filename, 'w', newline='') as csvfile:
+class TimingDiagramExporter:
+    # Timing diagram sink - dense CSV with one column per cycle, written as instructions retire.
+    # The header needs the final cycle count, so rows go to a temporary file first and are copied behind the header on close,
+    # padded to the full width.
+    def __init__(self, filename):
+        self.filename = filename
+        self.rowspath = filename + ".rows"
+        self.rowsfile = open(self.rowspath, 'w', newline='')
+        self.last_cycles = array('i')
+        self.max_cols = 0
+
+    def write(self, idx, record, row):
+        parts = [csv_field(format_resolved(record))]
+        col = 0
+        for val, start, end in row.spans():
+            parts.append(',' * (start - col - 1))
+            parts.append((',' + val) * (end + 1 - start))
+            col = end
+        parts.append('\n')
+        self.rowsfile.write(''.join(parts))
+        self.last_cycles.append(col)
+        self.max_cols = max(self.max_cols, col + 1)
+
+    def close(self):
+        self.rowsfile.close()
+        with open(self.filename, 'w', newline='') as csvfile:
             writer = csv.writer(csvfile)
             
             # Write column numbers in the first row
             writer.writerow([''] + list(range(1, self.max_cols+1)))
             
             # Write data rows
-            for i in range(self.max_rows):
-                row_data = [''] * self.max_cols
-                for val, col in self.timing_diagram[i]:
-                    row_data[col] = val
-                row_data[0] = self.instrs.Read(i)
-                writer.writerow(row_data)
-                
-            
+            with open(self.rowspath, 'r', newline='') as rowsfile:
+                for line, last_cycle in zip(rowsfile, self.last_cycles):
+                    csvfile.write(line[:-1])
+                    csvfile.write(',' * (self.max_cols - 1 - last_cycle))
+                    csvfile.write('\r\n')
+        os.remove(self.rowspath)
+        print("Timing diagram written to:", self.filename)
+
+class SparseTimingDiagramExporter:
+    # Timing diagram sink - one CSV line per stage interval of each instruction, written as instructions retire
+    def __init__(self, filename):
+        self.filename = filename
+        self.csvfile = open(filename, 'w', newline='')
+        self.writer = csv.writer(self.csvfile)
+        self.writer.writerow(["idx", "instruction", "stage", "start", "end"])
+
+    def write(self, idx, record, row):
+        label = format_resolved(record)
+        self.writer.writerows([idx, label, val, start, end] for val, start, end in row.spans())
+
+    def close(self):
+        self.csvfile.close()
+        print("Timing diagram written to:", self.filename)
 
 class Config(object):
     def __init__(self, iodir):
@@ -62,48 +240,305 @@ class Config(object):
                 print(key, "\t:" , self.parameters[key])
         print("")
 
-class IMEM(object):
-    def __init__(self, iodir):
-        self.size = pow(2, 16) # Can hold a maximum of 2^16 instructions.
+def simulate_banks(banks_used, n_banks, bank_busy_time):
+    # Bank model of the vector load/store unit, one address issued per cycle (1 lane). A busy bank takes one extra
+    # cycle to resolve the conflict. Returns the cycles spent after the pipeline depth, including the trailing empty
+    # issue group and the cycles for the banks to drain, and the busy periods of each bank as (bank, first step,
+    # last step), steps counted from the first address issued.
+    banks = [0 for _ in range(n_banks)]
+    busy_since = [None] * n_banks
+    intervals = []
+    step = 0
+    for step, bank in enumerate(list(banks_used) + [None]):
+        if bank is not None:
+            if banks[bank] != 0:        # Bank is busy?
+                banks[bank] += 1        # Add 1 cycle to resolve conflict
+            else:
+                busy_since[bank] = step
+            banks[bank] += bank_busy_time
+        # Reduce remaining cycles for each bank
+        for i in range(n_banks):
+            if banks[i] > 0:
+                banks[i] -= 1
+                if banks[i] == 0:
+                    intervals.append((i, busy_since[i], step))
+    # Banks still busy after the trailing empty issue group drain
+    for i in range(n_banks):
+        if banks[i] > 0:
+            intervals.append((i, busy_since[i], step + banks[i]))
+    return len(banks_used) + max(banks), intervals
+
+def bank_busy_intervals(addresses, n_banks, bank_busy_time):
+    # Busy periods of each bank for the addresses of a load/store (int, range or tuple), see simulate_banks
+    if type(addresses) is int:
+        addresses = [addresses]
+    return simulate_banks([adr % n_banks for adr in addresses], n_banks, bank_busy_time)[1]
+
+@functools.lru_cache(maxsize=4096)
+def strided_bank_cycles(stride, count, n_banks, bank_busy_time):
+    # simulate_banks cycles for the constant stride access base, base + stride, ... (count addresses), in closed form -
+    # the base does not matter. The bank sequence repeats every `period` addresses, so each bank is revisited after
+    # `period` cycles - by then it has `bank_busy_time - period` cycles left, and every revisit of a still busy bank
+    # adds bank_busy_time + 1. check_strided_bank_cycles compares it against simulate_banks.
+    stride %= n_banks
+    period = n_banks // gcd(stride, n_banks)
+    if bank_busy_time > period:
+        growth = bank_busy_time - period + 1
+    else:
+        growth = 0
+    left = 0
+    for first in range(min(period, count)):
+        visits = (count - 1 - first) // period + 1
+        last_visit = first + (visits - 1) * period
+        # Busy cycles after the last visit, less the cycles up to and including the trailing empty issue group
+        left = max(left, bank_busy_time + (visits - 1) * growth - (count - last_visit + 1))
+    return count + left
+
+def check_strided_bank_cycles(max_banks = 24, max_busy = 12, max_count = 48):
+    # Every (stride, count, banks, busy time) up to the limits where the closed form disagrees with simulate_banks,
+    # as (stride, count, n_banks, bank_busy_time, closed form, simulated)
+    mismatches = []
+    for n_banks in range(1, max_banks + 1):
+        for bank_busy_time in range(max_busy + 1):
+            for stride in range(n_banks):
+                for count in range(1, max_count + 1):
+                    closed = strided_bank_cycles.__wrapped__(stride, count, n_banks, bank_busy_time)
+                    simulated = simulate_banks([(i * stride) % n_banks for i in range(count)], n_banks, bank_busy_time)[0]
+                    if closed != simulated:
+                        mismatches.append((stride, count, n_banks, bank_busy_time, closed, simulated))
+    return mismatches
+
+def normalize_banks(addresses, n_banks):
+    # Bank of each address, with the banks renumbered in order of first use - patterns differing only by base or bank
+    # permutation share one memo entry
+    numbers = {}
+    return tuple([numbers.setdefault(address % n_banks, len(numbers)) for address in addresses])
+
+@functools.lru_cache(maxsize=4096)
+def gather_bank_cycles(banks_used, n_banks, bank_busy_time):
+    return simulate_banks(banks_used, n_banks, bank_busy_time)[0]
+
+class ChromeTraceExporter:
+    # Timing diagram sink - Chrome trace-event JSON (chrome://tracing, ui.perfetto.dev), written as instructions retire.
+    # One cycle is shown as one microsecond. Tracks: fetch, decode, one per functional unit, one per dispatch queue
+    # and one per memory bank.
+    QUEUE_NAMES = ["VDQ", "VCQ", "SCQ"]
+    PIPELINE_PID, QUEUE_PID, BANK_PID = 1, 2, 3
+
+    def __init__(self, filename, config: Config):
+        self.filename = filename
+        self.n_banks = config.parameters["vdmNumBanks"]
+        self.bank_busy_time = config.parameters["vdmBankBusyTime"]
+        self.tids = {"Fetch": 0, "Decode": 1}
+        self.tids.update({name: tid + 2 for tid, name in enumerate(FU_NAMES)})
+        self.jsonfile = open(filename, 'w')
+        self.jsonfile.write("[\n")
+        self.first = True
+
+        # Track names
+        for pid, name in [(self.PIPELINE_PID, "Pipeline"), (self.QUEUE_PID, "Dispatch Queues"), (self.BANK_PID, "Memory Banks")]:
+            self.event({"name": "process_name", "ph": "M", "pid": pid, "args": {"name": name}})
+        for name, tid in self.tids.items():
+            self.event({"name": "thread_name", "ph": "M", "pid": self.PIPELINE_PID, "tid": tid, "args": {"name": name}})
+            self.event({"name": "thread_sort_index", "ph": "M", "pid": self.PIPELINE_PID, "tid": tid, "args": {"sort_index": tid}})
+        for tid, name in enumerate(self.QUEUE_NAMES):
+            self.event({"name": "thread_name", "ph": "M", "pid": self.QUEUE_PID, "tid": tid, "args": {"name": name}})
+        for bank in range(self.n_banks):
+            self.event({"name": "thread_name", "ph": "M", "pid": self.BANK_PID, "tid": bank, "args": {"name": "Bank " + str(bank)}})
+
+    def event(self, event):
+        if not self.first:
+            self.jsonfile.write(",\n")
+        self.first = False
+        self.jsonfile.write(json.dumps(event))
+
+    def slice(self, name, category, pid, tid, start, end, args):
+        self.event({"name": name, "cat": category, "ph": "X", "ts": start, "dur": end + 1 - start, "pid": pid, "tid": tid, "args": args})
+
+    def write(self, idx, record, row):
+        label = format_resolved(record)
+        args = {"idx": idx}
+        fetched = None
+        first_execute = None
+        for stage, start, end in row.spans():
+            if stage == "F":
+                fetched = start
+                self.slice(label, "fetch", self.PIPELINE_PID, self.tids["Fetch"], start, end, args)
+            elif stage == "E":
+                if first_execute is None:
+                    first_execute = start
+                self.slice(label, "execute", self.PIPELINE_PID, self.tids[row.unit], start, end, args)
+            elif row.issued is not None and start > row.issued:
+                # Issued, but waiting in the FU for older instructions to finish (HALT/CVM/MTCL)
+                self.slice(label, "wait", self.PIPELINE_PID, self.tids[row.unit], start, end, args)
+
+        if row.dispatched is not None:
+            if fetched is not None and row.dispatched > fetched:
+                self.slice(label, "decode", self.PIPELINE_PID, self.tids["Decode"], fetched + 1, row.dispatched, args)
+            if row.issued is not None:
+                # Queue residencies overlap, so they are async slices, stacked within the queue's track
+                queue_args = {"idx": idx, "instruction": label}
+                tid = self.QUEUE_NAMES.index(row.queue)
+                self.event({"name": row.queue, "cat": "queue", "ph": "b", "id": idx, "ts": row.dispatched, "pid": self.QUEUE_PID, "tid": tid, "args": queue_args})
+                self.event({"name": row.queue, "cat": "queue", "ph": "e", "id": idx, "ts": row.issued + 1, "pid": self.QUEUE_PID, "tid": tid})
+
+        if row.unit == "VectorLS" and record[2] is not None and first_execute is not None:
+            for bank, start, end in bank_busy_intervals(record[2], self.n_banks, self.bank_busy_time):
+                self.slice(label, "bank", self.BANK_PID, bank, first_execute + start, first_execute + end, args)
+
+    def close(self):
+        self.jsonfile.write("\n]\n")
+        self.jsonfile.close()
+        print("Timing trace written to:", self.filename)
+
+class DecodeCache(object):
+    # LRU cache of decoded instruction templates, keyed on (resolved code record, vector length).
+    # Templates are shared between instances of an instruction and must not be modified.
+    def __init__(self, max_size = 4096):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        template = self.entries.get(key)
+        if template is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.entries.move_to_end(key)
+        return template
+
+    def put(self, key, template):
+        if self.max_size <= 0:
+            return
+        self.entries[key] = template
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+class StreamIMEM(object):
+    # IMEM fed by an iterator of resolved code records - a trace file, or the functional simulator's Core.execute() (co-simulation).
+    # The iterator is kept at most `window` records ahead of the instruction being read, and records behind it are dropped,
+    # so memory stays flat however long the program runs. Reads must be in increasing index order.
+    def __init__(self, records, window = 256):
+        self.records = iter(records)
+        self.window = deque()
+        self.window_size = max(window, 1)
+        self.base = 0 # index of the oldest record held in the window
+        self.done = False
+        self.digest = None # with track_digest, hash of the records dropped so far (the first `base` records)
+
+    def track_digest(self):
+        # Hashes every record as it is dropped, so a checkpoint can tell which resolved code it was taken with
+        self.digest = hashlib.sha256()
+
+    def drop(self, record):
+        if self.digest is not None:
+            self.digest.update(encode_record(record))
+
+    def fill(self):
+        while len(self.window) < self.window_size and not self.done:
+            try:
+                self.window.append(next(self.records))
+            except StopIteration:
+                self.done = True
+
+    def Read(self, idx): # Returns None past the end of the resolved code.
+        while self.base < idx:
+            if self.window:
+                self.drop(self.window.popleft())
+            else:
+                # Skipping past the window (e.g. resuming from a checkpoint)
+                try:
+                    self.drop(next(self.records))
+                except StopIteration:
+                    self.done = True
+                    break
+            self.base += 1
+        self.fill()
+        if idx < self.base:
+            print("IMEM - ERROR: Record at index", idx, "already dropped from the look-ahead window")
+        elif idx - self.base < len(self.window):
+            return self.window[idx - self.base]
+
+    def peek(self, idx): # Reads ahead past the window without dropping anything. Returns None past the end of the resolved code.
+        while self.base + len(self.window) <= idx and not self.done:
+            try:
+                self.window.append(next(self.records))
+            except StopIteration:
+                self.done = True
+        if self.base <= idx < self.base + len(self.window):
+            return self.window[idx - self.base]
+
+class IMEM(StreamIMEM):
+    # Resolved code from Resolved_Code.txt, or the binary Resolved_Code.bin, read as the core fetches it
+    def __init__(self, iodir, binary = False, window = 256, cache = None):
         self.filepath = os.path.abspath(os.path.join(iodir, "Resolved_Code.txt"))
-        self.instructions = []
+        self.tracepath = os.path.abspath(os.path.join(iodir, "Resolved_Code.bin"))
 
         try:
-            with open(self.filepath, 'r') as insf:
-                self.instructions = [ins.split('#')[0].strip() for ins in insf.readlines() if not (ins.startswith('#') or ins.strip() == '')]
+            if binary:
+                self.filepath = self.tracepath
+                super().__init__(read_trace(self.filepath), window)
+            elif cache is not None:
+                # Streamed from the cached binary trace of the text file, or parsed and cached along the way
+                super().__init__(cache.records("Resolved_Code", [self.filepath], lambda: read_resolved(self.filepath)), window)
+            else:
+                super().__init__(read_resolved(self.filepath), window)
+            self.fill()
             print("IMEM - Instructions loaded from file:", self.filepath)
-            # print("IMEM - Instructions:", self.instructions)
         except:
             print("IMEM - ERROR: Couldn't open file in path:", self.filepath)
             raise
 
-    def Read(self, idx): # Use this to read from IMEM.
-        if idx < self.size:
-            return self.instructions[idx]
-        else:
-            print("IMEM - ERROR: Invalid memory access at index: ", idx, " with memory size: ", self.size)
-
 class DMEM(object):
     # Word addressible - each address contains 32 bits.
-    def __init__(self, name, iodir, addressLen):
+    def __init__(self, name, iodir, addressLen, image = False, cache = None):
         self.name = name
         self.size = pow(2, addressLen)
         self.min_value  = -pow(2, 31)
         self.max_value  = pow(2, 31) - 1
         self.ipfilepath = os.path.abspath(os.path.join(iodir, name + ".txt"))
         self.opfilepath = os.path.abspath(os.path.join(iodir, name + "OP.txt"))
-        self.data = []
+        # Binary memory images - raw little-endian 32-bit words
+        self.ipimagepath = os.path.abspath(os.path.join(iodir, name + ".bin"))
+        self.opimagepath = os.path.abspath(os.path.join(iodir, name + "OP.bin"))
+        self.data = array('i')
+        self.touched = set() # addresses written since the memory was loaded
+        self.initialized = 0
 
         try:
-            with open(self.ipfilepath, 'r') as ipf:
-                self.data = [int(line.strip()) for line in ipf.readlines()]
-            print(self.name, "- Data loaded from file:", self.ipfilepath)
-            # print(self.name, "- Data:", self.data)
-            self.data.extend([0x0 for i in range(self.size - len(self.data))])
+            if image:
+                self.load_image(self.ipimagepath)
+                print(self.name, "- Data loaded from image:", self.ipimagepath)
+            elif cache is not None and cache.lookup(self.name, [self.ipfilepath], ".bin") is not None:
+                # Parsed before - load the cached image of the text file
+                self.load_image(cache.lookup(self.name, [self.ipfilepath], ".bin"))
+                print(self.name, "- Data loaded from cached image of file:", self.ipfilepath)
+            else:
+                with open(self.ipfilepath, 'r') as ipf:
+                    self.data = array('i', map(int, ipf.read().split()))
+                if cache is not None:
+                    cache.store_words(self.name, [self.ipfilepath], self.data)
+                print(self.name, "- Data loaded from file:", self.ipfilepath)
+            # Number of words loaded from the input file, the rest of the memory is zero
+            self.initialized = len(self.data)
+            self.data.frombytes(bytes(self.data.itemsize * max(self.size - len(self.data), 0)))
         except:
-            print(self.name, "- ERROR: Couldn't open input file in path:", self.ipfilepath)
+            print(self.name, "- ERROR: Couldn't open input file in path:", self.ipimagepath if image else self.ipfilepath)
             raise
 
+    def load_image(self, path):
+        with open(path, 'rb') as ipf:
+            if os.path.getsize(path) > 0:
+                with mmap.mmap(ipf.fileno(), 0, access=mmap.ACCESS_READ) as image:
+                    self.data.frombytes(image)
+        if sys.byteorder == 'big':
+            self.data.byteswap()
+
     def Read(self, idx: int): # Use this to read from DMEM.
         if idx < self.size:
             return self.data[idx]
@@ -114,21 +549,52 @@ class DMEM(object):
     def Write(self, idx: int, val: int): # Use this to write into DMEM.
         if idx < self.size:
             self.data[idx] = val
+            self.touched.add(idx)
             return self.data[idx]
         else:
             print("DMEM - ERROR: Invalid memory access at index: ", idx, " with memory size: ", self.size)
             return None
 
-    def dump(self):
+    def ranges(self):
+        # Sorted (start, end) address ranges which were loaded from the input file or written since
+        ranges = []
+        if self.initialized > 0:
+            ranges.append([0, self.initialized])
+        for idx in sorted(self.touched):
+            if ranges and ranges[-1][0] <= idx <= ranges[-1][1]:
+                ranges[-1][1] = max(ranges[-1][1], idx + 1)
+            else:
+                ranges.append([idx, idx + 1])
+        return ranges
+
+    def dump(self, sparse = False):
+        # Dense dump writes every word, sparse dump writes only the loaded and written ranges, each one prefixed by "@<start address>"
         try:
             with open(self.opfilepath, 'w') as opf:
-                lines = [str(data) + '\n' for data in self.data]
-                opf.writelines(lines)
+                if sparse:
+                    for start, end in self.ranges():
+                        opf.write("@" + str(start) + "\n")
+                        opf.write("".join([str(data) + '\n' for data in self.data[start:end]]))
+                else:
+                    opf.write("".join([str(data) + '\n' for data in self.data]))
             print(self.name, "- Dumped data into output file in path:", self.opfilepath)
         except:
             print(self.name, "- ERROR: Couldn't open output file in path:", self.opfilepath)
             raise
 
+    def dump_image(self):
+        try:
+            data = self.data
+            if sys.byteorder == 'big':
+                data = array('i', data)
+                data.byteswap()
+            with open(self.opimagepath, 'wb') as opf:
+                data.tofile(opf)
+            print(self.name, "- Dumped data into output image in path:", self.opimagepath)
+        except:
+            print(self.name, "- ERROR: Couldn't open output image in path:", self.opimagepath)
+            raise
+
 class RegisterFile(object):
     def __init__(self, name, count, length = 1, size = 32):
         self.name       = name
@@ -183,13 +649,22 @@ class RegisterFile(object):
             raise
 
 class Queue():
-    def __init__(self, max_length: int):
-        self.queue = []
+    # Dispatch queue - FIFO on a deque, so push, pop and unpop are O(1). Instructions are peeked with getNextInQueue
+    # and popped only once they can issue.
+    def __init__(self, name, max_length: int):
+        self.name = name
+        self.queue = deque()
         self.max_length = max_length
+        # Occupancy statistics, sampled once per cycle
+        self.cycles = 0
+        self.occupancy = 0 # sum of the queue length over the sampled cycles
+        self.full_cycles = 0
+        self.peak = 0
     
     def add(self, item):
         if len(self.queue) < self.max_length:
             self.queue.append(item)
+            self.peak = max(self.peak, len(self.queue))
             return True
         else:
             print("ERROR - Queue already full!")
@@ -197,14 +672,12 @@ class Queue():
         
     def pop(self):
         if len(self.queue) > 0:
-            item = self.queue[0]
-            self.queue = self.queue[1:]
-            return item
+            return self.queue.popleft()
         else:
             print("ERROR - Queue is empty!")
             return None
     def unpop(self, instr):
-        self.queue = [instr] + self.queue
+        self.queue.appendleft(instr)
         return None
     
     def getNextInQueue(self):
@@ -214,49 +687,155 @@ class Queue():
         else:
             print("WARNING - Queue is empty!")
             return None
+
+    def sample(self, cycles = 1):
+        # Accounts the current occupancy for `cycles` cycles
+        self.cycles += cycles
+        self.occupancy += len(self.queue) * cycles
+        if len(self.queue) >= self.max_length:
+            self.full_cycles += cycles
+
+    def printStats(self):
+        average = self.occupancy / self.cycles if self.cycles else 0
+        print(" {} occupancy - avg: {:.2f}, peak: {}/{}, full: {} cycles".format(self.name, average, self.peak, self.max_length, self.full_cycles))
         
     def __str__(self):
-        return str(self.queue)
+        return str(list(self.queue))
     
     def __len__(self):
         return len(self.queue)
     
 class BusyBoard():
+    # Busy bits packed into an int - bit idx is set while entry idx is busy
     def __init__(self, length: int):
         self.length = length
-        self.statuses = ['free' for _ in range(self.length)]
+        self.mask = 0
 
     def setBusy(self, idx = 0):
         if idx < self.length:
-            self.statuses[idx] = 'busy'
+            self.mask |= 1 << idx
         else:
             print(idx, self.length)
             print("ERROR - Invalid index access in the busy board!")
     
     def clearStatus(self, idx = 0):
         if idx < self.length:
-            self.statuses[idx] = 'free'
+            self.mask &= ~(1 << idx)
         else:
             print("ERROR - Invalid index access in the busy board!")
 
+    def isBusy(self, idx = 0):
+        return (self.mask >> idx) & 1 == 1
+
     def getStatus(self, idx = 0):
         if idx < self.length:
-            return self.statuses[idx]
+            return 'busy' if self.isBusy(idx) else 'free'
         else:
             print("ERROR - Invalid index access in the busy board!")
             return None
 
-class FU(BusyBoard):
-    def __init__(self, name):
-        super().__init__(1)
+class Instruction(object):
+    # Decoded instruction - word, fu (FU number), cycles, operands (packed register operands, index 0 -> Destination Register),
+    # wait (one of WAIT_INSTRS) and idx (instr_idx). Templates from decode_template have no idx and are shared through the
+    # decode cache, instance() gives the per-instruction copy.
+    __slots__ = ["word", "fu", "cycles", "operands", "wait", "idx"]
+
+    def __init__(self, word: str, fu: int, cycles: int, operands: tuple, idx = None):
+        self.word = word
+        self.fu = fu
+        self.cycles = cycles
+        self.operands = operands
+        self.wait = word in WAIT_INSTRS
+        self.idx = idx
+
+    def instance(self, idx: int):
+        instr = Instruction.__new__(Instruction)
+        instr.word = self.word
+        instr.fu = self.fu
+        instr.cycles = self.cycles
+        instr.operands = self.operands
+        instr.wait = self.wait
+        instr.idx = idx
+        return instr
+
+    def signature(self): # everything but idx
+        return (self.word, self.fu, self.cycles, self.operands)
+
+    def __repr__(self):
+        return "{}({})".format(self.word, self.idx)
+
+class Scoreboard(object):
+    # Register operands of the in-flight instructions (dispatched, not yet completed) - for every register, the
+    # instr_idx of its in-flight writers (destination operand) and readers (other operands), oldest first.
+    # Instructions are added in program order, so each list stays sorted and its head is the oldest user.
+    def __init__(self):
+        self.writers = {} # packed register operand : [instr_idx]
+        self.readers = {}
+
+    def users(self, instr: Instruction):
+        for position, register in enumerate(instr.operands):
+            yield (self.writers if position == 0 else self.readers), register
+
+    def add(self, instr: Instruction):
+        for table, register in self.users(instr):
+            table.setdefault(register, []).append(instr.idx)
+
+    def remove(self, instr: Instruction):
+        for table, register in self.users(instr):
+            idxs = table[register]
+            idxs.remove(instr.idx)
+            if not idxs:
+                del table[register]
+
+    def shift(self, n):
+        # Renumbers every in-flight instruction n instructions later
+        for table in [self.writers, self.readers]:
+            for register, idxs in table.items():
+                table[register] = [idx + n for idx in idxs]
+
+    def oldest(self, table, register):
+        idxs = table.get(register)
+        return idxs[0] if idxs else None
+
+    def hazard(self, instr: Instruction):
+        # The first operand of instr used by an older in-flight instruction, None if there is none. With
+        # OPTIMIZE_READ_PORTS only the destinations of older instructions count, otherwise a shared read port makes any
+        # shared register a hazard.
+        instr_idx = instr.idx
+        tables = [self.writers] if OPTIMIZE_READ_PORTS else [self.writers, self.readers]
+        for register in instr.operands:
+            for table in tables:
+                oldest = self.oldest(table, register)
+                if oldest is not None and oldest < instr_idx:
+                    return register
+        return None
+
+class FU():
+    # Functional unit, its busy status is bit fu_id of the shared FU busy board
+    def __init__(self, fu_id: int, busy_board: BusyBoard):
+        self.id = fu_id
+        self.name = FU_NAMES[fu_id]
+        self.bit = 1 << fu_id
+        self.busy_board = busy_board
         self.cycles = 0
         self.instr = None
-        self.name = name
-    def addInstr(self, instr):
+
+    def addInstr(self, instr: Instruction):
         self.instr = instr
-        self.cycles = instr["cycles"]
+        self.cycles = instr.cycles
         self.setBusy()
 
+    def setBusy(self):
+        self.busy_board.mask |= self.bit
+
+    def clearStatus(self):
+        self.busy_board.mask &= ~self.bit
+
+    def isBusy(self):
+        return self.busy_board.mask & self.bit != 0
+
+    def getStatus(self):
+        return 'busy' if self.isBusy() else 'free'
     
     def decrement(self):
         self.cycles -= 1
@@ -267,11 +846,190 @@ class FU(BusyBoard):
     
     def __str__(self):
         return self.name
-    
+
+class StallProfiler(object):
+    # Stall attribution - every cycle an instruction waits in decode or in a dispatch queue is charged to one cause,
+    # and aggregated per cause, per opcode, per FU (the FU the instruction waits for) and per register (operand in
+    # flight only). Bank conflicts are charged once per load/store, for the extra cycles in the LS unit.
+    # The stalls of the current cycle are kept, so cycles skipped by the event engine are charged the same.
+    def __init__(self):
+        self.cycle_stalls = [] # (word, FU name, cause, register) charged in the current cycle
+        self.by_cause = {}
+        self.by_opcode = {} # (word, cause) : cycles
+        self.by_fu = {} # (FU name, cause) : cycles
+        self.by_register = {} # (register name, cause) : cycles
+
+    def begin_cycle(self):
+        self.cycle_stalls = []
+
+    def stall(self, instr: Instruction, cause: str, register = None):
+        # Charges one cycle of instr to cause, register is the packed operand behind an operand in flight stall
+        entry = (instr.word, FU_NAMES[instr.fu], cause, None if cause != STALL_OPERAND else operand_name(register))
+        self.cycle_stalls.append(entry)
+        self.charge(entry, 1)
+
+    def repeat(self, cycles: int, decode_stalled = True):
+        # The current cycle's stalls repeat for `cycles` more cycles. Without decode_stalled the decode stage does not
+        # retry its dispatch (HALT already seen), so its queue full stall is not repeated
+        for entry in self.cycle_stalls:
+            if decode_stalled or entry[2] != STALL_QUEUE_FULL:
+                self.charge(entry, cycles)
+
+    def charge(self, entry: tuple, cycles: int):
+        word, fu_name, cause, register = entry
+        self.by_cause[cause] = self.by_cause.get(cause, 0) + cycles
+        self.by_opcode[(word, cause)] = self.by_opcode.get((word, cause), 0) + cycles
+        self.by_fu[(fu_name, cause)] = self.by_fu.get((fu_name, cause), 0) + cycles
+        if register is not None:
+            self.by_register[(register, cause)] = self.by_register.get((register, cause), 0) + cycles
+
+    def printStats(self):
+        print(" Stall cycles by cause: " + ", ".join(["{}: {}".format(cause, self.by_cause[cause]) for cause in STALL_CAUSES if cause in self.by_cause]))
+        totals = {}
+        for (fu_name, _), cycles in self.by_fu.items():
+            totals[fu_name] = totals.get(fu_name, 0) + cycles
+        print(" Stall cycles by FU: " + ", ".join(["{}: {}".format(fu_name, totals[fu_name]) for fu_name in FU_NAMES if fu_name in totals]))
+
+    def dump(self, filename):
+        # One line per (group, name, cause) counter, largest first within each group
+        with open(filename, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(["group", "name", "cause", "cycles"])
+            writer.writerows([["cause", cause, cause, self.by_cause[cause]] for cause in STALL_CAUSES if cause in self.by_cause])
+            for group, counters in [("opcode", self.by_opcode), ("fu", self.by_fu), ("register", self.by_register)]:
+                writer.writerows([[group, name, cause, cycles] for (name, cause), cycles in sorted(counters.items(), key=lambda item: -item[1])])
+        print("Stall profile written to:", filename)
+
+class LoopDetector(object):
+    # Steady-state detection for Core.steady_state. After every fetch the core state is recorded with the in-flight
+    # instruction indices made relative to the fetched instruction. The model is deterministic, so when a state recurs
+    # `period` instructions and `delta` cycles later, and the next `period` records match the last `period` records,
+    # the next period runs exactly like the last one - it can be accounted for as `delta` cycles without simulating it.
+    def __init__(self, verify = False, max_period = 4096):
+        self.verify = verify
+        self.max_period = max_period
+        self.states = {} # state : (instr_idx, cycle, queue counters)
+        self.order = deque() # (state, instr_idx), oldest first
+        self.signatures = deque(maxlen=max_period) # record signatures of the last fetched instructions
+        self.predictions = {} # verify mode - instr_idx : (cycle, state) expected at its fetch
+        # Statistics
+        self.periods = set()
+        self.iterations = 0
+        self.instructions = 0
+        self.cycles = 0
+        self.verified = 0
+        self.mismatches = 0
+
+    def observe(self, state, instr_idx, cycle, counters):
+        # Records the state at the fetch of instr_idx, returns the previous occurrence of the state or None
+        previous = self.states.get(state)
+        self.states[state] = (instr_idx, cycle, counters)
+        self.order.append((state, instr_idx))
+        if len(self.order) > self.max_period:
+            old_state, old_idx = self.order.popleft()
+            if self.states[old_state][0] == old_idx:
+                del self.states[old_state]
+        return previous
+
+    def body(self, period):
+        # Signatures of the last `period` fetched records
+        return list(self.signatures)[-period:]
+
+    def reset(self):
+        # Recorded instruction indices and cycles no longer line up after a jump
+        self.states.clear()
+        self.order.clear()
+        self.signatures.clear()
+
+    def printStats(self):
+        if self.verify:
+            print(" Steady-state check: {} fetches predicted one loop iteration ahead, {} mismatches".format(self.verified + self.mismatches, self.mismatches))
+        elif self.iterations:
+            print(" Steady-state extrapolation: {} loop iterations ({} instructions, {} cycles), loop lengths: {}".format(self.iterations, self.instructions, self.cycles, sorted(self.periods)))
+        else:
+            print(" Steady-state extrapolation: not used")
+
+class Sampler(object):
+    # Statistical sampling for Core.sample_step. Each period of `period` instructions holds one window, starting at a
+    # random offset within the period so the windows do not alias with the loop bodies: `warmup` instructions are
+    # simulated in detail to refill the pipeline, then the cycles between the fetches of the next `length` instructions
+    # are measured. Everything outside the windows is fast-forwarded - skipped with only the vector length tracked, and
+    # the pipeline flushed. The skipped instructions are accounted for at the mean measured cycles per instruction, and
+    # so are the warm-ups after a flush - they start from an empty pipeline, so their own cycles are too low.
+    def __init__(self, period, length = 200, warmup = 200, seed = 0):
+        self.period = period
+        self.length = length
+        self.warmup = warmup
+        self.random = random.Random(seed)
+        self.period_start = 0 # instr_idx of the first instruction of the current period
+        self.start = self.period_start + self.offset() # instr_idx of the first instruction of the current window
+        self.measure_start = None # cycle of the first measured fetch
+        self.samples = [] # (instructions, cycles) of each measured interval
+        self.skipped = 0
+        self.flushed_at = None # cycle of the flush before the current window, None if its warm-up is not cold
+        self.warmup_cycles = 0 # cycles and instructions of the warm-ups after a flush
+        self.warmup_instructions = 0
+
+    def offset(self):
+        # Random start of a window within its period
+        return self.random.randint(0, self.period - self.warmup - self.length)
+
+    def warmed_up(self, instr_idx, cycle):
+        # The fetch of instr_idx ends the warm-up of the current window (or HALT cuts it short)
+        if self.flushed_at is not None:
+            self.warmup_cycles += cycle - self.flushed_at
+            self.warmup_instructions += instr_idx - self.start
+            self.flushed_at = None
+
+    def next_window(self):
+        # Moves to the window of the next period, returns its first instr_idx
+        self.period_start += self.period
+        self.start = self.period_start + self.offset()
+        return self.start
+
+    def cpi(self):
+        # Mean cycles per instruction over the samples, and the half-width of its 95% confidence interval
+        cpis = [cycles / instructions for instructions, cycles in self.samples]
+        mean = sum([cycles for _, cycles in self.samples]) / sum([instructions for instructions, _ in self.samples])
+        if len(cpis) < 2:
+            return mean, float("inf")
+        average = sum(cpis) / len(cpis)
+        variance = sum([(cpi - average) ** 2 for cpi in cpis]) / (len(cpis) - 1)
+        quantile = T_QUANTILES_95[len(cpis) - 2] if len(cpis) - 1 <= len(T_QUANTILES_95) else 1.96
+        return mean, quantile * (variance / len(cpis)) ** 0.5
+
+    def estimate(self, cycles, simulated):
+        # Total cycles - the simulated cycles, with the skipped instructions and the warm-ups after a flush at the mean
+        # CPI, and the confidence half-width. simulated - instructions simulated in detail
+        if not self.skipped:
+            return cycles, 0
+        if not self.samples:
+            # The program ended before the first window was measured - the CPI of the simulated part, without an interval
+            return cycles + round(self.skipped * cycles / max(simulated, 1)), float("inf")
+        cpi, half_width = self.cpi()
+        if self.warmup_instructions:
+            # The warm-ups run at other offsets than the measured intervals - the gap between their CPI and the measured
+            # one (phases, cold start) is the floor of the interval, the t interval alone is 0 if all windows agree
+            half_width = max(half_width, abs(self.warmup_cycles / self.warmup_instructions - cpi))
+        if half_width == 0:
+            # Every window measured the same CPI and no warm-up shows how far off it is - no interval
+            half_width = float("inf")
+        estimated = self.skipped + self.warmup_instructions
+        return cycles - self.warmup_cycles + round(estimated * cpi), estimated * half_width
+
+    def reliable(self):
+        # The t interval assumes the windows saw the variation of the program - not if they all measured the same CPI,
+        # e.g. all in one loop while a rarer phase was skipped
+        return len(set([cycles / instructions for instructions, cycles in self.samples])) > 1
+
+    def printStats(self, simulated):
+        total = simulated + self.skipped
+        print(" Sampling: {} intervals of {} instructions (warm-up {}), one at a random offset every {}, {:.1f}% of {} instructions simulated in detail".format(len(self.samples), self.length, self.warmup, self.period, 100 * simulated / total if total else 0, total))
+
 # TODO - Check if you can create classes for Frontend and Backend
 
 class Core():
-    def __init__(self, imem: IMEM, sdmem: DMEM, vdmem: DMEM, config: Config):
+    def __init__(self, imem: IMEM, sdmem: DMEM, vdmem: DMEM, config: Config, engine = "cycle", sink = None, decode_cache_size = 4096, extrapolate = "off", sampler = None, profile = False):
         self.imem = imem
         self.sdmem = sdmem
         self.vdmem = vdmem
@@ -280,6 +1038,11 @@ class Core():
         # cycle counter
         self.cycle = 0
 
+        # Engine mode - "cycle" steps through every cycle, "event" jumps over cycles where only the FUs count down
+        self.event_driven = engine == "event"
+        # Set whenever something other than an FU countdown happens in the current cycle
+        self.activity = False
+
         self.RFs = {"SRF": RegisterFile("SRF", 8),
                     "VRF": RegisterFile("VRF", 8, 64)}
         
@@ -288,380 +1051,335 @@ class Core():
         self.VLR.Write(0, [self.RFs["VRF"].vec_length])
         
         # Initializing Vector Data Queue, Vector Compute Queue, Scalar Compute Queue
-        self.VDQ = Queue(self.config.parameters["dataQueueDepth"])
-        self.VCQ = Queue(self.config.parameters["computeQueueDepth"])
-        self.SCQ = Queue(self.config.parameters["computeQueueDepth"])
+        self.VDQ = Queue("VDQ", self.config.parameters["dataQueueDepth"])
+        self.VCQ = Queue("VCQ", self.config.parameters["computeQueueDepth"])
+        self.SCQ = Queue("SCQ", self.config.parameters["computeQueueDepth"])
 
         # Register Files' Busy Boards
         self.SRFBB = BusyBoard(self.RFs["SRF"].reg_count)
         self.VRFBB = BusyBoard(self.RFs["VRF"].reg_count)
         
-        # Functional Unit Busy Boards
-        self.VectorLS = FU("VectorLS")
-        self.VectorADD = FU("VectorADD")
-        self.VectorMUL = FU("VectorMUL")
-        self.VectorDIV = FU("VectorDIV")
-        self.VectorSHUF = FU("VectorSHUF")
-        self.ScalarU = FU("ScalarU")
+        # Functional Unit Busy Board, one bit per FU
+        self.FUBB = BusyBoard(len(FU_NAMES))
+        self.FUs = [FU(fu_id, self.FUBB) for fu_id in range(len(FU_NAMES))] # indexed by FU number
+        self.VectorLS = self.FUs[FU_VECTOR_LS]
+        self.VectorADD = self.FUs[FU_VECTOR_ADD]
+        self.VectorMUL = self.FUs[FU_VECTOR_MUL]
+        self.VectorDIV = self.FUs[FU_VECTOR_DIV]
+        self.VectorSHUF = self.FUs[FU_VECTOR_SHUF]
+        self.ScalarU = self.FUs[FU_SCALAR]
+
+        # Dispatch queue of each FU, indexed by FU number
+        self.dispatch_queues = [self.VDQ, self.VCQ, self.VCQ, self.VCQ, self.VCQ, self.SCQ]
 
         self.IF_HALT = False
         self.ID_HALT = False
         self.EX_HALT = False
 
-        self.timing_diagram = []
-        instr_idx = 0
-        while self.imem.Read(instr_idx) != "HALT":
-            instr_idx+=1
-            self.timing_diagram.append([])
-        self.timing_diagram.append([]) # For halt
-
-        self.wait_instrs = {"HALT", "CVM", "MTCL"}
-    
-    def get_operands(self, instruction: list, is_load = False):
-        if len(instruction) == 4:
-            destination = str(instruction[1])
-            operand1 = str(instruction[2])
-            operand2 = str(instruction[3])
-            destination_reg_idx = int(destination[2:])
-            operand1_reg_idx = int(operand1[2:])
-            if operand2.isdigit() or operand2[0] == '-':
-                imm = int(operand2)
-                return [destination_reg_idx, operand1_reg_idx, imm]
-            else:
-                operand2_reg_idx = int(operand2[2:])
-                return [destination_reg_idx, operand1_reg_idx, operand2_reg_idx]
-        elif len(instruction) == 3:
-            destination = str(instruction[1])
-            operand1 = str(instruction[2])
-            destination_reg_idx = int(destination[2:])
-            if operand1.startswith('('):
-                address = eval(operand1)
-                # print(type(address))
-                if type(address) == int and not is_load:
-                    return [destination_reg_idx]
-                return [destination_reg_idx, address]
+        # Rows of the in-flight instructions, retired rows go to the sink (e.g. TimingDiagramExporter) or are dropped
+        self.timing_diagram = TimingDiagram(sink)
+
+        # Decoded instruction templates - unrolled loops repeat the same instructions
+        self.decode_cache = DecodeCache(decode_cache_size)
+
+        # Register operands of the in-flight instructions, for the hazard checks
+        self.scoreboard = Scoreboard()
+        # Wait instructions (HALT/CVM/MTCL) in the SCQ, oldest first
+        self.queued_waits = deque()
+
+        # Stall attribution (StallProfiler), None when disabled
+        self.profiler = StallProfiler() if profile else None
+
+        # Steady-state loop extrapolation - "off", "on", or "verify" (simulate everything, check the predictions)
+        self.loop_detector = None
+        if extrapolate != "off":
+            if profile:
+                print("Core - WARNING: Steady-state extrapolation disabled, the stall profile needs every instruction simulated")
+            elif sink is not None:
+                print("Core - WARNING: Steady-state extrapolation disabled, the timing diagram needs every instruction simulated")
+            elif sampler is not None:
+                print("Core - WARNING: Steady-state extrapolation disabled, sampling skips instructions already")
             else:
-                operand1_reg_idx = int(operand1[2:])
-                return [destination_reg_idx, operand1_reg_idx]
-        elif len(instruction) == 2:
-            operand1 = str(instruction[1])
-            if operand1.startswith('('):
-                address = eval(operand1)
-                if type(address) == int and not is_load:
-                    return []
-                return [address]
-            else:
-                operand1_reg_idx = int(operand1[2:])
-                return [operand1_reg_idx]
-        else:
-            return None
+                self.loop_detector = LoopDetector(extrapolate == "verify")
+
+        # Fetch stage - (instr_idx of the next fetch, fetched record waiting for decode, dispatch_success), see run()
+        self.fetch_state = (0, None, True)
+        # Checkpoints to write - [(cycle, checkpoint file path)], in cycle order
+        self.checkpoints = []
+
+        # Statistical sampling (Sampler) - the cycle count becomes an estimate
+        self.sampler = sampler
+        if sampler is not None and sink is not None:
+            print("Core - WARNING: Sampling disabled, the timing diagram needs every instruction simulated")
+            self.sampler = None
+    
+    def get_operands(self, instruction: tuple, is_load = False):
+        # instruction is a resolved code record - (word, operand tokens, address, vector length)
+        operands = [int(operand) if operand.isdigit() or operand[0] == '-' else int(operand[2:]) for operand in instruction[1]]
+        address = instruction[2]
+        if address is None or (type(address) == int and not is_load):
+            return operands
+        return operands + [address]
     
     
     def calculate_bank_cycles(self, addresses):
-        # Takes in addersses, return n_cycles
-        
+        # Takes in addersses (int, range or tuple), return n_cycles
         n_cycles = self.config.parameters["vlsPipelineDepth"]  # Initial pipeline depth
         n_banks = self.config.parameters["vdmNumBanks"]
-        n_lanes = 1
-
-        banks = [0 for _ in range(n_banks)]
-        # print("Banks:", n_banks, "Lanes:", n_lanes)
-        addrs = []
-        if type(addresses) is not int:
-            for i in range((len(addresses) // n_lanes) + 1):
-                start_idx = i*n_lanes
-                end_idx   = (i+1)*n_lanes
-
-                addrs.append(
-                    addresses[start_idx:end_idx]
-                )
-        else:
+        bank_busy_time = self.config.parameters["vdmBankBusyTime"]
+
+        if type(addresses) is int:
             # For the case when there is only one load address or one store address, i.e. VLR of 1
-            addrs.append([addresses])
-        # print("Addrs:", addrs)
-        # addrs = [[addresses to issue at cycle 1], [addresses to issue at cycle 2]]
-
-        for adrs in addrs:
-            # adrs = [0, 1, 2, 3]
-            # print("Loading addresses:", adrs)
-            for adr in adrs:
-                if banks[adr % n_banks] != 0:   # Bank [adr % n_bank] is busy?
-                    # print("Hit:", adr)
-                    banks[adr % n_banks] += 1   # Add 1 cycle to resolve conflict
-                banks[adr % n_banks] += self.config.parameters["vdmBankBusyTime"] # Add however many cycles are required in general to finish load/store
-            # print(banks)
-            # Reduce remaining cycles for each bank
-            for i in range(n_banks):
-                if banks[i] > 0:
-                    banks[i] -= 1
-            n_cycles += 1
-            # print(banks)
-        
-        # If anything is left in bank busy, then add it to n_banks
-        return n_cycles + max(banks) -1
+            return n_cycles + max(bank_busy_time, 1) - 1
+        if type(addresses) is range:
+            # Constant stride - closed form
+            return n_cycles + strided_bank_cycles(addresses.step, len(addresses), n_banks, bank_busy_time)
+        # Gathers and other patterns - memoized on the bank sequence, with banks numbered in order of first use
+        return n_cycles + gather_bank_cycles(normalize_banks(addresses, n_banks), n_banks, bank_busy_time)
     
+    def bank_conflict_cycles(self, instruction: tuple, cycles: int):
+        # Load/store cycles above a conflict-free access of the same length, with every address in a different bank
+        addresses = self.get_operands(instruction, is_load=True)[1]
+        if type(addresses) is int:
+            return 0
+        bank_busy_time = self.config.parameters["vdmBankBusyTime"]
+        conflict_free = strided_bank_cycles(1, len(addresses), len(addresses) + 1, bank_busy_time)
+        return cycles - self.config.parameters["vlsPipelineDepth"] - conflict_free
+
     def q_instrs_before(self, idx):
+        # Queues are in program order, so only their heads need checking
         Qs = [self.VCQ, self.VDQ, self.SCQ]
         for q in Qs:
-            for q_instr in q.queue:
-                if q_instr["instr_idx"] < idx:
-                    return True
+            if len(q) > 0 and q.getNextInQueue().idx < idx:
+                return True
         return False
     
     def wait_instr_in_q(self):
-        q = self.SCQ
-        for q_instr in q.queue:
-            if q_instr["instructionWord"] in self.wait_instrs:
-                return q_instr, True
+        if self.queued_waits:
+            return self.queued_waits[0], True
         
         fu = self.ScalarU
-        if fu.getStatus() == "busy" and fu.instr["instructionWord"] in self.wait_instrs:
+        if fu.isBusy() and fu.instr.wait:
             return fu.instr, True
         return None, False
     
     def fu_filled_lt_instr(self, idx):
-        FUs = [self.VectorLS, self.VectorADD, self.VectorDIV, self.VectorMUL, self.VectorSHUF]
-        for fu in FUs:
-            if fu.getStatus() == "busy" and fu.instr["instr_idx"] < idx:
+        # Any vector FU busy with an instruction older than idx
+        busy = self.FUBB.mask & ~self.ScalarU.bit
+        for fu in self.FUs:
+            if busy & fu.bit and fu.instr.idx < idx:
                 return True
-            
         return False
     def execute(self):
         # instr has FU
         FUs = [self.ScalarU, self.VectorLS, self.VectorADD, self.VectorDIV, self.VectorMUL, self.VectorSHUF]
 
         for fu in FUs:
-            if fu.name == "ScalarU":
-                if fu.getStatus() == "busy" and fu.instr["instructionWord"] in self.wait_instrs:
+            if fu.id == FU_SCALAR:
+                if fu.isBusy() and fu.instr.wait:
                     fu.clearStatus()
                     c = False
-                    # print(self.fu_filled(), self.q_instrs_before(fu.instr["instr_idx"]))
-                    if self.fu_filled_lt_instr(fu.instr["instr_idx"]):
+                    # print(self.fu_filled(), self.q_instrs_before(fu.instr.idx))
+                    if self.fu_filled_lt_instr(fu.instr.idx):
                         # If FU is filled or there are instrs that need to be executed before instr in the queue
                         c = True
                     fu.setBusy()
                     # if self.cycle == 220:
 
                     if c:
-                        self.timing_diagram[fu.instr["instr_idx"]].append(("D", self.cycle))
+                        self.timing_diagram[fu.instr.idx].append(("D", self.cycle))
+                        if self.profiler is not None:
+                            self.profiler.stall(fu.instr, STALL_WAIT)
                         continue
 
-            if fu.getStatus() == "busy":
+            if fu.isBusy():
                 # print("FU {} is busy {}".format(fu, fu.cycles))
                 clear_operands = fu.decrement()
-                self.timing_diagram[fu.instr["instr_idx"]].append(("E", self.cycle))
+                self.timing_diagram[fu.instr.idx].append(("E", self.cycle))
                 if clear_operands:
-                    operands = fu.instr["operand_with_type"]
+                    self.activity = True
+                    operands = fu.instr.operands
+                    self.scoreboard.remove(fu.instr)
+                    self.timing_diagram.retire(fu.instr.idx)
                     fu.instr = None
-                    for (idx, _type) in operands:
-                        if _type == "scalar":
-                            self.SRFBB.clearStatus(idx)
-                        if _type == "vector":
-                            self.VRFBB.clearStatus(idx)
+                    for operand in operands:
+                        if operand != NO_REGISTER:
+                            self.register_busy_board(operand).clearStatus(operand >> 1)
         
         # for fu in FUs:
 
     
-    def decode(self, current_instruction: list, instr_idx: int):
-        '''
-        Returns an Instruction Dictionary = {
-            instructionWord: ,
-            functionalUnit: VectorLS/VectorADD/VectorMUL/VectorDIV/VectorSHUF/ScalarU,
-            cycles: (int),
-            operand_with_type: list([idx, scalar])
-                               index = 0 -> Destination Register
-        }
-        '''
-
-        instruction_dict = dict()
+    def decode(self, current_instruction: tuple, instr_idx: int):
+        # Returns an Instruction, with instr_idx as its idx
+        key = (current_instruction, self.VLR.Read(0)[0])
+        template = self.decode_cache.get(key)
+        if template is None:
+            template = self.decode_template(current_instruction)
+            self.decode_cache.put(key, template)
+        elif current_instruction[0] == 'MTCL':
+            self.VLR.Write(0, [current_instruction[3]])
+        return template.instance(instr_idx)
+
+    def decode_template(self, current_instruction: tuple):
+        # Decodes the parts of an instruction which do not depend on its position in the trace
         instruction_word = str(current_instruction[0])
-        instruction_dict['instructionWord'] = instruction_word
-        instruction_dict['instr_idx'] = instr_idx
                 
         if instruction_word == 'HALT' or instruction_word == 'CVM':
-            instruction_dict['functionalUnit'] = 'ScalarU'
-            instruction_dict['cycles'] = 1
-            instruction_dict['operand_with_type'] = []
+            fu = FU_SCALAR
+            cycles = 1
+            registers = []
         elif instruction_word == 'ADDVV' or instruction_word == 'SUBVV':
             operands = self.get_operands(current_instruction)
-            instruction_dict['functionalUnit'] = 'VectorADD'
-            instruction_dict['cycles'] = self.config.parameters['pipelineDepthAdd'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
-            instruction_dict['operand_with_type'] = [[operands[0], 'vector'], [operands[1], 'vector'], [operands[2], 'vector']]
+            fu = FU_VECTOR_ADD
+            cycles = self.config.parameters['pipelineDepthAdd'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
+            registers = [vector_operand(operands[0]), vector_operand(operands[1]), vector_operand(operands[2])]
         elif instruction_word == 'ADDVS' or instruction_word == 'SUBVS':
             operands = self.get_operands(current_instruction)
-            instruction_dict['functionalUnit'] = 'VectorADD'
-            instruction_dict['cycles'] = self.config.parameters['pipelineDepthAdd'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
-            instruction_dict['operand_with_type'] = [[operands[0], 'vector'], [operands[1], 'vector'], [operands[2], 'scalar']]
+            fu = FU_VECTOR_ADD
+            cycles = self.config.parameters['pipelineDepthAdd'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
+            registers = [vector_operand(operands[0]), vector_operand(operands[1]), scalar_operand(operands[2])]
         elif instruction_word == 'MULVV':
             operands = self.get_operands(current_instruction)
-            instruction_dict['functionalUnit'] = 'VectorMUL'
-            instruction_dict['cycles'] = self.config.parameters['pipelineDepthMul'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
-            instruction_dict['operand_with_type'] = [[operands[0], 'vector'], [operands[1], 'vector'], [operands[2], 'vector']]
+            fu = FU_VECTOR_MUL
+            cycles = self.config.parameters['pipelineDepthMul'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
+            registers = [vector_operand(operands[0]), vector_operand(operands[1]), vector_operand(operands[2])]
         elif instruction_word == 'MULVS':
             operands = self.get_operands(current_instruction)
-            instruction_dict['functionalUnit'] = 'VectorMUL'
-            instruction_dict['cycles'] = self.config.parameters['pipelineDepthMul'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
-            instruction_dict['operand_with_type'] = [[operands[0], 'vector'], [operands[1], 'vector'], [operands[2], 'scalar']]
+            fu = FU_VECTOR_MUL
+            cycles = self.config.parameters['pipelineDepthMul'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
+            registers = [vector_operand(operands[0]), vector_operand(operands[1]), scalar_operand(operands[2])]
         elif instruction_word == 'DIVVV':
             operands = self.get_operands(current_instruction)
-            instruction_dict['functionalUnit'] = 'VectorDIV'
-            instruction_dict['cycles'] = self.config.parameters['pipelineDepthDiv'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
-            instruction_dict['operand_with_type'] = [[operands[0], 'vector'], [operands[1], 'vector'], [operands[2], 'vector']]
+            fu = FU_VECTOR_DIV
+            cycles = self.config.parameters['pipelineDepthDiv'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
+            registers = [vector_operand(operands[0]), vector_operand(operands[1]), vector_operand(operands[2])]
         elif instruction_word == 'DIVVS':
             operands = self.get_operands(current_instruction)
-            instruction_dict['functionalUnit'] = 'VectorDIV'
-            instruction_dict['cycles'] = self.config.parameters['pipelineDepthDiv'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
-            instruction_dict['operand_with_type'] = [[operands[0], 'vector'], [operands[1], 'vector'], [operands[2], 'scalar']]
+            fu = FU_VECTOR_DIV
+            cycles = self.config.parameters['pipelineDepthDiv'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
+            registers = [vector_operand(operands[0]), vector_operand(operands[1]), scalar_operand(operands[2])]
         elif "PACK" in instruction_word:
             operands = self.get_operands(current_instruction)
-            instruction_dict['functionalUnit'] = 'VectorSHUF'
-            instruction_dict['cycles'] = self.config.parameters['pipelineDepthShuffle'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
-            instruction_dict['operand_with_type'] = [[operands[0], 'vector'], [operands[1], 'vector'], [operands[2], 'vector']]
+            fu = FU_VECTOR_SHUF
+            cycles = self.config.parameters['pipelineDepthShuffle'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
+            registers = [vector_operand(operands[0]), vector_operand(operands[1]), vector_operand(operands[2])]
         elif instruction_word.startswith('LV') or instruction_word.startswith('SV'):
             operands = self.get_operands(current_instruction, is_load=True)
-            instruction_dict['functionalUnit'] = 'VectorLS'
-            instruction_dict['cycles'] = self.calculate_bank_cycles(operands[1])
-            instruction_dict['operand_with_type'] = [[operands[0], 'vector']]
+            fu = FU_VECTOR_LS
+            cycles = self.calculate_bank_cycles(operands[1])
+            registers = [vector_operand(operands[0])]
         elif instruction_word.startswith('S') and instruction_word.endswith('VV'):
             operands = self.get_operands(current_instruction)
-            instruction_dict['functionalUnit'] = 'VectorADD'
-            instruction_dict['cycles'] = self.config.parameters['pipelineDepthAdd'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
+            fu = FU_VECTOR_ADD
+            cycles = self.config.parameters['pipelineDepthAdd'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
             # TODO - Check if None type is fine here, because there is no destination register for these instructions
-            instruction_dict['operand_with_type'] = [[None, None], [operands[0], 'vector'], [operands[1], 'vector']]
+            registers = [NO_REGISTER, vector_operand(operands[0]), vector_operand(operands[1])]
         elif instruction_word.startswith('S') and instruction_word.endswith('VS'):
             operands = self.get_operands(current_instruction)
-            instruction_dict['functionalUnit'] = 'VectorADD'
-            instruction_dict['cycles'] = self.config.parameters['pipelineDepthAdd'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
+            fu = FU_VECTOR_ADD
+            cycles = self.config.parameters['pipelineDepthAdd'] + (self.VLR.Read(0)[0] // self.config.parameters['numLanes']) - 1
             # TODO - Check if None type is fine here, because there is no destination register for these instructions
-            instruction_dict['operand_with_type'] = [[None, None], [operands[0], 'vector'], [operands[1], 'scalar']]
+            registers = [NO_REGISTER, vector_operand(operands[0]), scalar_operand(operands[1])]
         else:
-            instruction_dict['functionalUnit'] = 'ScalarU'
-            instruction_dict['cycles'] = 1
+            fu = FU_SCALAR
+            cycles = 1
             if instruction_word == 'MTCL':
-                operands = self.get_operands(current_instruction[:2])
-                instruction_dict['operand_with_type'] = [[operands[0], 'scalar']]
-                VLR_val = eval(current_instruction[2])
-                self.VLR.Write(0, VLR_val)
+                operands = self.get_operands(current_instruction)
+                registers = [scalar_operand(operands[0])]
+                self.VLR.Write(0, [current_instruction[3]])
                 # print("VLR Value: ", self.VLR.Read(0))
             else:
                 operands = self.get_operands(current_instruction)
                 if not operands:
                     operands = []
-                instruction_dict['operand_with_type'] = [[_, 'scalar'] for _ in operands]
-        return instruction_dict
+                registers = [scalar_operand(_) for _ in operands]
+        return Instruction(instruction_word, fu, cycles, tuple(registers))
     
 
-    def dispatch_to_queue(self, instr: dict):
-        # Checking Vector Data Queue
-        Qs = [self.VDQ, self.VCQ, self.SCQ]
-        FUs = [{"VectorLS", }, {"VectorADD", "VectorMUL", "VectorDIV", "VectorSHUF",}, {"ScalarU"}]
-        self.timing_diagram[instr["instr_idx"]].append(("D", self.cycle))
-        for q, fus in zip(Qs, FUs):
-            if len(q) < q.max_length and instr['functionalUnit'] in fus:
-                # print(instr)
-                # if not self.operands_in_flight(instr):
-                q.add(instr)
-                return True
+    def dispatch_to_queue(self, instr: Instruction):
+        row = self.timing_diagram[instr.idx]
+        row.append(("D", self.cycle))
+        q = self.dispatch_queues[instr.fu]
+        if len(q) < q.max_length:
+            # print(instr)
+            # if not self.operands_in_flight(instr):
+            q.add(instr)
+            self.scoreboard.add(instr)
+            if instr.wait:
+                self.queued_waits.append(instr)
+            self.activity = True
+            row.queue = q.name
+            row.dispatched = self.cycle
+            return True
+        if self.profiler is not None:
+            self.profiler.stall(instr, STALL_QUEUE_FULL)
         return False
     
-    def operands_in_flight(self, instr):
-        qs = [self.VDQ, self.VCQ, self.SCQ]
-        fus = [
-            self.VectorLS,
-            self.VectorADD,
-            self.VectorMUL, 
-            self.VectorDIV, 
-            self.VectorSHUF,
-            self.ScalarU
-        ]
-        operands = instr["operand_with_type"]
-        instr_idx = instr["instr_idx"]
-        # print(operands)
-        if len(operands) == 0:
-            return False
-        for fu in fus:
-            if fu.getStatus() == "busy":
-                busy_instr_idx = fu.instr["instr_idx"]
-                _destinations = fu.instr["operand_with_type"]
-                if OPTIMIZE_READ_PORTS:
-                    # If there are any number of read ports, then we only need to track dependencies based on writes
-                    _destinations = _destinations[0:1]
-                for busy_destination in _destinations:
-                # busy_destination = fu.instr["operand_with_type"][0] # (op, type)
-                # print("destination", busy_destination, fu.instr)
-                    for opr in operands:
-                        if opr[0] == busy_destination[0] and opr[1] == busy_destination[1] and busy_instr_idx < instr_idx:
-                            return True
-                
-        for q in qs:
-            for q_instr in q.queue:
-                # Error handling for HALT and CVM instruction, as they have no destination register
-                if len(q_instr["operand_with_type"]) != 0:
-                    _destinations = q_instr["operand_with_type"]
-                    if OPTIMIZE_READ_PORTS:
-                        # If there are any number of read ports, then we only need to track dependencies based on writes
-                        _destinations = _destinations[0:1]
-                    for busy_destination in _destinations:
-                    # busy_destination = q_instr["operand_with_type"][0] # (op, type)
-                        busy_instr_idx = q_instr["instr_idx"]
-
-                        for opr in operands:
-                            if opr[0] == busy_destination[0] and opr[1] == busy_destination[1] and busy_instr_idx < instr_idx:
-                                return True
-        # print("NO FLIGHT")
-        return False
-        
+    def operands_in_flight(self, instr: Instruction):
+        # Register hazard - the operand of instr an older instruction in a queue or an FU uses, None if there is none
+        if len(instr.operands) == 0:
+            return None
+        return self.scoreboard.hazard(instr)
 
+    def register_busy_board(self, operand: int):
+        return self.VRFBB if operand & 1 else self.SRFBB
 
     def pop_from_queues(self):
         Qs = [self.VDQ, self.VCQ, self.SCQ]
-        _mapping = {
-            "VectorLS": self.VectorLS,
-            "VectorADD": self.VectorADD,
-            "VectorMUL": self.VectorMUL,
-            "VectorDIV": self.VectorDIV,
-            "VectorSHUF": self.VectorSHUF,
-            "ScalarU": self.ScalarU
-        }
         for q in Qs:
             for instr in q.queue:
-                self.timing_diagram[instr["instr_idx"]].append(("D", self.cycle))
+                self.timing_diagram[instr.idx].append(("D", self.cycle))
         for q in Qs:
             if len(q) > 0:
                 wait_instr, waitInQ = self.wait_instr_in_q()
                 if waitInQ:                     # If a wait instruction is in queue
                     instr = q.getNextInQueue()
-                    if instr["instr_idx"] > wait_instr["instr_idx"]:
+                    if instr.idx > wait_instr.idx:
                         # If this q has instr after the wait instr then go to next q
+                        if self.profiler is not None:
+                            for queued in q.queue:
+                                self.profiler.stall(queued, STALL_WAIT)
                         continue
-                    # elif instr["instr_idx"] == wait_instr["instr_idx"]:
+                    # elif instr.idx == wait_instr.idx:
                         # If this instr is the wait instr:
 
 
-                instr = q.pop()
-                fu = _mapping[instr["functionalUnit"]]
+                instr = q.getNextInQueue()
+                fu = self.FUs[instr.fu]
                 
                 
-                if fu.getStatus() == "free" and not self.operands_in_flight(instr):
+                hazard = None if fu.isBusy() else self.operands_in_flight(instr)
+                if not fu.isBusy() and hazard is None:
+                    q.pop()
                     fu.addInstr(instr)
-                    operands = instr["operand_with_type"]
-                    for (operand, _type) in operands:
-                        if operand != None:
-                            if _type == "scalar":
-                                bb = self.SRFBB
-                            else:
-                                bb = self.VRFBB
-                            bb.setBusy(operand)
-                else:
-                    q.unpop(instr)
-                    # print("Stalling the instruction - {} is busy".format(instr["functionalUnit"]))    # fu.setBusy()
+                    if self.queued_waits and self.queued_waits[0] is instr:
+                        self.queued_waits.popleft()
+                    self.activity = True
+                    row = self.timing_diagram[instr.idx]
+                    row.unit = fu.name
+                    row.issued = self.cycle
+                    for operand in instr.operands:
+                        if operand != NO_REGISTER:
+                            self.register_busy_board(operand).setBusy(operand >> 1)
+                elif self.profiler is not None:
+                    if fu.isBusy():
+                        self.profiler.stall(instr, STALL_FU_BUSY)
+                    else:
+                        self.profiler.stall(instr, STALL_OPERAND, hazard)
+                if self.profiler is not None:
+                    for queued in q.queue:
+                        if queued is not instr:
+                            self.profiler.stall(queued, STALL_QUEUE_ORDER)
+                # else:
+                    # print("Stalling the instruction - {} is busy".format(FU_NAMES[instr.fu]))    # fu.setBusy()
             # else:
             #     print("No instructions in Queue:", q)
 
     def fetch(self, idx):
-        if idx < len(self.imem.instructions):
-            instr = self.imem.Read(idx)
-            return instr.split(" ")
+        instr = self.imem.Read(idx)
+        if instr is not None:
+            self.activity = True
+            return instr
     
     def q_filled(self):
         Qs = [self.VCQ, self.VDQ, self.SCQ]
@@ -671,18 +1389,7 @@ class Core():
         return False
     
     def fu_filled(self):
-        FUs = [
-            self.VectorLS,
-            self.VectorADD,
-            self.VectorMUL,
-            self.VectorDIV,
-            self.VectorSHUF,
-            self.ScalarU
-        ]
-        for fu in FUs:
-            if fu.getStatus() == "busy":
-                return True
-        return False
+        return self.FUBB.mask != 0
 
     def printStatus(self):
         print("=== Queues ===")
@@ -701,21 +1408,325 @@ class Core():
         ]
         for fu in FUs:
             print("{}: Instr {} Cycles {} Status {}".format(fu, fu.instr, fu.cycles, fu.getStatus()))
+
+    def wait_instr_blocked(self):
+        # A wait instruction (HALT/CVM/MTCL) in the scalar unit does not count down while older vector instructions are executing
+        fu = self.ScalarU
+        return fu.isBusy() and fu.instr.wait and self.fu_filled_lt_instr(fu.instr.idx)
+
+    def skip_idle_cycles(self, stalled_idx):
+        '''
+        Called at the end of a cycle in which nothing but FU countdowns happened - no FU finished, nothing
+        was dispatched, issued or fetched. Until the next FU completes, every following cycle repeats the
+        exact same decisions, so those cycles are accounted for in bulk and the core jumps to the cycle
+        of the next completion event.
+
+        stalled_idx - index of the instruction stuck in decode because its dispatch queue is full (or None)
+        '''
+        blocked_fu = self.ScalarU if self.wait_instr_blocked() else None
+        counting_fus = [fu for fu in self.FUs if fu.isBusy() and fu is not blocked_fu]
+        if not counting_fus:
+            return
+
+        # The next interesting cycle is the earliest FU completion, simulated in detail by the main loop
+        next_event = min(fu.cycles for fu in counting_fus)
+        n_skip = next_event - 1
+        if self.checkpoints:
+            # Stop at the next checkpoint cycle, so the checkpoint is taken there
+            n_skip = min(n_skip, self.checkpoints[0][0] - self.cycle)
+        if n_skip <= 0:
+            return
+
+        # Each instruction has a single role over the skipped cycles, so its row gets one interval
+        first, last = self.cycle + 1, self.cycle + n_skip
+        if blocked_fu is not None:
+            self.timing_diagram[blocked_fu.instr.idx].add_range("D", first, last)
+        for fu in counting_fus:
+            self.timing_diagram[fu.instr.idx].add_range("E", first, last)
+        if stalled_idx is not None:
+            self.timing_diagram[stalled_idx].add_range("D", first, last)
+        for q in [self.VDQ, self.VCQ, self.SCQ]:
+            for instr in q.queue:
+                self.timing_diagram[instr.idx].add_range("D", first, last)
+            q.sample(n_skip)
+
+        if self.profiler is not None:
+            self.profiler.repeat(n_skip, stalled_idx is not None)
+
+        for fu in counting_fus:
+            fu.cycles -= n_skip
+        self.cycle += n_skip
     
+    def record_signature(self, record: tuple):
+        # The parts of a resolved code record the timing depends on - loads and stores by their bank cycles instead of
+        # their addresses, so a loop body with shifted addresses repeats
+        word = record[0]
+        if word.startswith('LV') or word.startswith('SV'):
+            return (word, record[1], self.calculate_bank_cycles(self.get_operands(record, is_load=True)[1]))
+        address = record[2] if type(record[2]) is not int else None
+        return (word, record[1], address, record[3] if word == 'MTCL' else None)
+
+    def loop_state(self, instr_idx: int, signature: tuple):
+        # Core state at the fetch of instr_idx, with the in-flight instructions numbered relative to it
+        queues = tuple([tuple([(instr.idx - instr_idx, instr.signature()) for instr in q.queue]) for q in [self.VDQ, self.VCQ, self.SCQ]])
+        fus = tuple([(fu.instr.idx - instr_idx, fu.instr.signature(), fu.cycles, fu.isBusy()) if fu.instr is not None else fu.isBusy() for fu in self.FUs])
+        return (signature, self.VLR.Read(0)[0], queues, fus)
+
+    def queue_counters(self):
+        return [(q.cycles, q.occupancy, q.full_cycles) for q in [self.VDQ, self.VCQ, self.SCQ]]
+
+    def period_repeats(self, instr_idx: int, body: list):
+        # True if the records after instr_idx repeat the signatures in body
+        for offset, signature in enumerate(body, 1):
+            record = self.imem.peek(instr_idx + offset)
+            if record is None or self.record_signature(record) != signature:
+                return False
+        return True
+
+    def shift_in_flight(self, n: int):
+        # Renumbers the in-flight instructions n instructions later
+        instrs = {}
+        for q in [self.VDQ, self.VCQ, self.SCQ]:
+            for instr in q.queue:
+                instrs[id(instr)] = instr
+        for fu in self.FUs:
+            if fu.instr is not None:
+                instrs[id(fu.instr)] = fu.instr
+        for instr in instrs.values():
+            instr.idx += n
+        self.scoreboard.shift(n)
+        self.timing_diagram.shift(n)
+
+    def steady_state(self, instr_idx: int, instr: tuple):
+        '''
+        Called after every fetch. Once the core state at a fetch recurs, each following period whose records repeat the
+        last period is skipped - the in-flight instructions are renumbered, and the cycle counter and queue statistics
+        advance by the per-period deltas. Detailed simulation resumes at the first record that breaks the pattern
+        (the loop exit). In verify mode nothing is skipped, the state and cycle predicted for the end of each period
+        are checked once the detailed simulation gets there.
+
+        Returns the new (instr_idx, instr) - the next fetch index and the fetched record.
+        '''
+        detector = self.loop_detector
+        fetched_idx = instr_idx - 1
+        signature = self.record_signature(instr)
+        detector.signatures.append(signature)
+        state = self.loop_state(fetched_idx, signature)
+
+        prediction = detector.predictions.pop(fetched_idx, None)
+        if prediction is not None:
+            if prediction == (self.cycle, state):
+                detector.verified += 1
+            else:
+                detector.mismatches += 1
+
+        counters = self.queue_counters()
+        previous = detector.observe(state, fetched_idx, self.cycle, counters)
+        if previous is None:
+            return instr_idx, instr
+        period = fetched_idx - previous[0]
+        delta = self.cycle - previous[1]
+        body = detector.body(period)
+
+        if detector.verify:
+            if self.period_repeats(fetched_idx, body):
+                detector.predictions[fetched_idx + period] = (self.cycle + delta, state)
+            return instr_idx, instr
+
+        n = 0
+        # Never skips past the next pending checkpoint
+        max_n = (self.checkpoints[0][0] - self.cycle) // delta if self.checkpoints and delta > 0 else None
+        while (max_n is None or n < max_n) and self.period_repeats(fetched_idx + n * period, body):
+            n += 1
+            self.imem.Read(fetched_idx + n * period) # drops the skipped records
+        if n == 0:
+            return instr_idx, instr
+
+        self.shift_in_flight(n * period)
+        self.cycle += n * delta
+        for q, now, then in zip([self.VDQ, self.VCQ, self.SCQ], counters, previous[2]):
+            q.cycles += n * (now[0] - then[0])
+            q.occupancy += n * (now[1] - then[1])
+            q.full_cycles += n * (now[2] - then[2])
+        detector.periods.add(period)
+        detector.iterations += n
+        detector.instructions += n * period
+        detector.cycles += n * delta
+        detector.reset()
+        return instr_idx + n * period, self.imem.Read(fetched_idx + n * period)
+
+    def flush_pipeline(self):
+        # Drops every in-flight instruction (sampling fast-forward)
+        for q in [self.VDQ, self.VCQ, self.SCQ]:
+            q.queue.clear()
+        self.queued_waits.clear()
+        for fu in self.FUs:
+            fu.instr = None
+            fu.cycles = 0
+        self.FUBB.mask = 0
+        self.SRFBB.mask = 0
+        self.VRFBB.mask = 0
+        self.scoreboard = Scoreboard()
+
+    def sample_step(self, instr_idx: int, instr: tuple):
+        '''
+        Called after every fetch in sampling mode. Starts the measurement after the warm-up of the current window, and at
+        the end of the measured interval fast-forwards to the start of the next window (also from the first fetch, if
+        the first window does not start at instruction 0).
+
+        Returns the new (instr_idx, instr) - the next fetch index and the fetched record.
+        '''
+        sampler = self.sampler
+        fetched_idx = instr_idx - 1
+        if fetched_idx < sampler.start:
+            return self.fast_forward(fetched_idx, instr, sampler.start)
+        offset = fetched_idx - sampler.start
+        if offset == sampler.warmup:
+            sampler.measure_start = self.cycle
+            sampler.warmed_up(fetched_idx, self.cycle)
+        if offset != sampler.warmup + sampler.length:
+            return instr_idx, instr
+        sampler.samples.append((sampler.length, self.cycle - sampler.measure_start))
+        return self.fast_forward(fetched_idx, instr, sampler.next_window())
+
+    def fast_forward(self, fetched_idx: int, instr: tuple, target: int):
+        '''
+        Skips the records from the fetched one up to target without simulating them (MTCL still sets the vector length),
+        drops the in-flight instructions, and continues as if the record at target had just been fetched. HALT is never
+        skipped. Nothing is dropped if there is nothing to skip.
+
+        Returns the new (instr_idx, instr) - the next fetch index and the fetched record.
+        '''
+        if target <= fetched_idx:
+            return fetched_idx + 1, instr
+        sampler = self.sampler
+        record = instr
+        while fetched_idx < target and record is not None and record[0] != "HALT":
+            if record[0] == "MTCL":
+                self.VLR.Write(0, [record[3]])
+            fetched_idx += 1
+            sampler.skipped += 1
+            record = self.imem.Read(fetched_idx)
+        if record is None:
+            print("Core - ERROR: Resolved code ended without HALT at index:", fetched_idx)
+            raise IndexError(fetched_idx)
+
+        self.flush_pipeline()
+        self.timing_diagram.flush(fetched_idx)
+        self.timing_diagram.fetch(record, self.cycle)
+        if record[0] == "HALT":
+            self.IF_HALT = True
+        sampler.start = fetched_idx
+        sampler.flushed_at = self.cycle
+        return fetched_idx + 1, record
+
+    def checkpoint_state(self):
+        # Microarchitectural state at the end of the current cycle, in plain tuples and lists. In-flight instructions are
+        # (word, fu, cycles, operands, idx). The scoreboard and the queued wait instructions follow from the queues and FUs.
+        def instr_state(instr):
+            return None if instr is None else (instr.word, instr.fu, instr.cycles, instr.operands, instr.idx)
+        return {"cycle": self.cycle,
+                "fetch": self.fetch_state,
+                "halt": (self.IF_HALT, self.ID_HALT, self.EX_HALT),
+                "VL": self.VLR.Read(0)[0],
+                "queues": [([instr_state(instr) for instr in q.queue], (q.cycles, q.occupancy, q.full_cycles, q.peak)) for q in [self.VDQ, self.VCQ, self.SCQ]],
+                "FUs": [(instr_state(fu.instr), fu.cycles) for fu in self.FUs],
+                "busy": (self.FUBB.mask, self.SRFBB.mask, self.VRFBB.mask),
+                "trace": (self.imem.base, self.imem.digest.digest()),
+                "diagram": (self.timing_diagram.base, [retired for _, _, retired in self.timing_diagram.rows], self.timing_diagram.peak),
+                "config": dict(self.config.parameters)}
+
+    def save_checkpoint(self, filepath):
+        if self.timing_diagram.sink is not None or self.sampler is not None:
+            print("Core - ERROR: Checkpoints are not supported with a timing diagram or sampling")
+            return
+        try:
+            write_timing_checkpoint(filepath, self.checkpoint_state())
+            print("Core - Checkpoint at cycle", self.cycle, "written to:", filepath)
+        except OSError:
+            print("Core - ERROR: Couldn't write checkpoint in path:", filepath)
+
+    def restore_checkpoint(self, filepath, allow_config_change = False):
+        '''
+        Resumes from a checkpoint written by save_checkpoint. The resolved code must be the one the checkpoint was taken
+        with, up to the fetched instruction. With allow_config_change the current config may differ from the
+        checkpoint's (what-if runs from a warmed-up state) - the in-flight instructions keep the cycles they were decoded
+        with, and the instructions fetched from here on are decoded with the current config.
+        '''
+        try:
+            state = read_timing_checkpoint(filepath)
+        except ValueError as error:
+            print("Core - ERROR:", error)
+            raise
+
+        names = sorted(set(state["config"]) | set(self.config.parameters))
+        changed = [name for name in names if state["config"].get(name) != self.config.parameters.get(name)]
+        if changed:
+            differences = ", ".join(["{} {} -> {}".format(name, state["config"].get(name), self.config.parameters.get(name)) for name in changed])
+            if not allow_config_change:
+                print("Core - ERROR: Config differs from the checkpoint in:", differences, "- allow it explicitly for a what-if run (--allow-config-change)")
+                raise ValueError(filepath)
+            print("Core - Config differs from the checkpoint in:", differences)
+
+        # The resolved code is read up to the fetched instruction, hashing the records before it
+        instr_idx, fetched, _ = state["fetch"]
+        self.imem.track_digest()
+        record = self.imem.Read(instr_idx - 1) if instr_idx > 0 else None
+        if (self.imem.base, self.imem.digest.digest()) != state["trace"] or record != fetched:
+            print("Core - ERROR: Checkpoint was taken with a different resolved code:", filepath)
+            raise ValueError(filepath)
+
+        def instr_from_state(instr):
+            if instr is None:
+                return None
+            word, fu, cycles, operands, idx = instr
+            return Instruction(word, fu, cycles, operands, idx)
+
+        self.cycle = state["cycle"]
+        self.fetch_state = state["fetch"]
+        self.IF_HALT, self.ID_HALT, self.EX_HALT = state["halt"]
+        self.VLR.Write(0, [state["VL"]])
+        in_flight = []
+        for q, (instrs, stats) in zip([self.VDQ, self.VCQ, self.SCQ], state["queues"]):
+            q.queue = deque([instr_from_state(instr) for instr in instrs])
+            q.cycles, q.occupancy, q.full_cycles, q.peak = stats
+            in_flight.extend(q.queue)
+        self.queued_waits = deque([instr for instr in self.SCQ.queue if instr.wait])
+        for fu, (instr, cycles) in zip(self.FUs, state["FUs"]):
+            fu.instr = instr_from_state(instr)
+            fu.cycles = cycles
+            if fu.instr is not None:
+                in_flight.append(fu.instr)
+        for instr in sorted(in_flight, key=lambda instr: instr.idx):
+            self.scoreboard.add(instr)
+        self.FUBB.mask, self.SRFBB.mask, self.VRFBB.mask = state["busy"]
+
+        # Rows of the in-flight window, only their retired flags matter without a sink
+        base, retired_flags, peak = state["diagram"]
+        self.timing_diagram.base = base
+        self.timing_diagram.rows = deque([[None, TimingRow("F", self.cycle), retired] for retired in retired_flags])
+        self.timing_diagram.peak = peak
+        print("Core - Restored checkpoint at cycle", self.cycle, "from:", filepath)
+
     def run(self):
         # Printing current VMIPS configuration
         print("")
         self.config.printConfig()
 
-        # Index to iterate through the code file
-        instr_idx = 0
-        instr = None
+        # Index to iterate through the code file, and the fetched instruction - (0, None, True) unless restored
+        instr_idx, instr, dispatch_success = self.fetch_state
+        # Decoded fetched instruction, kept while it stalls in decode until it dispatches
+        decoded_instr = None
+        if self.checkpoints and self.imem.digest is None:
+            self.imem.track_digest()
         # Decode Stage List - list which holds all inflight instructions that are yet to be decoded and pushed to the queue
         # decode_stage = []
-        dispatch_success = True
         # print(self.timing_diagram, len(self.timing_diagram))
         while(not self.EX_HALT):
             self.cycle += 1
+            self.activity = False
+            if self.profiler is not None:
+                self.profiler.begin_cycle()
             self.execute()
             
             # Halting:
@@ -725,11 +1736,16 @@ class Core():
 
 
             if not self.ID_HALT and instr:
-                decoded_instr = self.decode(instr, instr_idx-1)
+                if decoded_instr is None:
+                    decoded_instr = self.decode(instr, instr_idx-1)
                 if instr[0] == "HALT":
                     self.ID_HALT = True
                     # continue # Don't dispatch halt to queue?
                 dispatch_success = self.dispatch_to_queue(decoded_instr)
+                if self.profiler is not None and dispatch_success and decoded_instr.fu == FU_VECTOR_LS:
+                    conflict_cycles = self.bank_conflict_cycles(instr, decoded_instr.cycles)
+                    if conflict_cycles > 0:
+                        self.profiler.charge((decoded_instr.word, FU_NAMES[FU_VECTOR_LS], STALL_BANK_CONFLICT, None), conflict_cycles)
             # If HALT has been reached, then all previous instrs have been successfully decoded and dispatched
 
 
@@ -738,11 +1754,32 @@ class Core():
             
             if not self.IF_HALT and dispatch_success:
                 instr = self.fetch(instr_idx)
-                self.timing_diagram[instr_idx].append(("F", self.cycle))
+                decoded_instr = None
+                if instr is None:
+                    print("Core - ERROR: Resolved code ended without HALT at index:", instr_idx)
+                    raise IndexError(instr_idx)
+                self.timing_diagram.fetch(instr, self.cycle)
                 if instr[0] == "HALT":
                     self.IF_HALT = True
                 if dispatch_success:
                     instr_idx += 1
+                if self.loop_detector is not None and not self.IF_HALT:
+                    instr_idx, instr = self.steady_state(instr_idx, instr)
+                if self.sampler is not None:
+                    if self.IF_HALT:
+                        self.sampler.warmed_up(instr_idx - 1, self.cycle)
+                    else:
+                        instr_idx, instr = self.sample_step(instr_idx, instr)
+
+            for q in [self.VDQ, self.VCQ, self.SCQ]:
+                q.sample()
+
+            if self.event_driven and not self.activity and not self.EX_HALT:
+                self.skip_idle_cycles(instr_idx - 1 if (not self.ID_HALT and instr) else None)
+
+            while self.checkpoints and self.checkpoints[0][0] <= self.cycle and not self.EX_HALT:
+                self.fetch_state = (instr_idx, instr, dispatch_success)
+                self.save_checkpoint(self.checkpoints.pop(0)[1])
 
             # print("Cycle:", self.cycle)
             # print(self.printStatus())
@@ -752,9 +1789,27 @@ class Core():
             # self.IF_NOP = instr[0] == "HALT"
 
         # self.cycle += 1 # Halt execute cycle
+        self.timing_diagram.close()
+
+        if self.sampler is not None:
+            simulated_cycles = self.cycle
+            self.cycle, half_width = self.sampler.estimate(self.cycle, len(self.timing_diagram) - self.sampler.skipped)
         
         print("------------------------------")
         print(" Total Cycles: ", self.cycle)
+        if self.sampler is not None:
+            print(" Sampled estimate - 95% confidence interval: +/- {:.0f} cycles ({:.2f}%), {} cycles simulated in detail".format(half_width, 100 * half_width / self.cycle, simulated_cycles))
+            if self.sampler.skipped and len(self.sampler.samples) > 1 and not self.sampler.reliable():
+                print(" Sampled estimate - unreliable interval, all {} measured intervals had the same CPI - use a shorter --sample period".format(len(self.sampler.samples)))
+            self.sampler.printStats(len(self.timing_diagram) - self.sampler.skipped)
+        print(" Peak in-flight instructions: ", self.timing_diagram.peak)
+        print(" Decode cache hits / misses: ", self.decode_cache.hits, "/", self.decode_cache.misses)
+        for q in [self.VDQ, self.VCQ, self.SCQ]:
+            q.printStats()
+        if self.profiler is not None:
+            self.profiler.printStats()
+        if self.loop_detector is not None:
+            self.loop_detector.printStats()
         print("------------------------------")
         # print(self.timing_diagram, len(self.timing_diagram))
 
@@ -762,10 +1817,6 @@ class Core():
         for rf in self.RFs.values():
             rf.dump(iodir)
 
-    def dumpTimingDiagram(self, iodir):
-        exporter = TimingDiagramExporter(self.timing_diagram, self.imem)
-        exporter.generate_excel(os.path.join(iodir, "timing_diagram_{}.csv".format(config.parameters["computeQueueDepth"])))
-
     def dumpResult(self, iodir):
         with open(os.path.join(iodir, 'result.txt'), 'w') as f:
             f.write("Total cycles: {}".format(self.cycle))
@@ -775,32 +1826,81 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description='Vector Core Functional Simulator')
     parser.add_argument('--iodir', default="", type=str, help='Path to the folder containing the input files - instructions and data.')
     parser.add_argument('--timing', default="N", type=str, help='Generate Timing Diagram CSV, Input: [Y/N]')
+    parser.add_argument('--diagram', default="dense", choices=["dense", "sparse", "chrome"], help='Timing diagram format - CSV with one column per cycle, CSV with one line per instruction stage interval (instruction, stage, start, end), or Chrome trace-event JSON')
+    parser.add_argument('--memin', default="text", choices=["text", "binary"], help='Load data memories from text files (SDMEM.txt/VDMEM.txt) or binary images (SDMEM.bin/VDMEM.bin)')
+    parser.add_argument('--tracein', default="text", choices=["text", "binary", "cosim"], help='Load the resolved code flow from text (Resolved_Code.txt), a binary trace (Resolved_Code.bin), or run the functional simulator alongside and stream it (cosim)')
+    parser.add_argument('--window', default=256, type=int, help='Look-ahead window - max resolved instructions read ahead of fetch, from the trace file or the functional simulator')
+    parser.add_argument('--decode-cache', default=4096, type=int, help='Max decoded instructions kept for reuse by later instances of the same instruction (0 disables the cache)')
+    parser.add_argument('--cache', action='store_true', help='Cache the parsed inputs in .simcache in the IO directory, keyed by a hash of the input files')
+    parser.add_argument('--engine', default="cycle", choices=["cycle", "event"], help='Simulation engine - step every cycle, or jump over cycles where only the FUs count down')
+    parser.add_argument('--extrapolate', default="off", choices=["off", "on", "verify"], help='Steady-state loop extrapolation - skip loop iterations that repeat the previous one exactly (on), or simulate them and check the predictions (verify). Not used with --timing Y')
+    parser.add_argument('--sample', default=0, type=int, nargs='?', const=5000, help='Statistical sampling - simulate a measured interval in detail every SAMPLE instructions (5000 if no value is given) and fast-forward through the rest, the cycle count is an estimate (0 disables sampling)')
+    parser.add_argument('--sample-length', default=200, type=int, help='Instructions measured in each sampled interval')
+    parser.add_argument('--sample-warmup', default=200, type=int, help='Instructions simulated in detail before each measured interval, to refill the pipeline')
+    parser.add_argument('--sample-seed', default=0, type=int, help='Seed of the random offsets of the sampled intervals within their periods')
+    parser.add_argument('--checkpoint', default=[], type=int, nargs='+', help='Write a checkpoint of the core state at each of these cycles (timing_checkpoint_<cycle>.ckpt)')
+    parser.add_argument('--restore', default=None, type=str, help='Resume from a checkpoint file, taken with the same resolved code and Config.txt')
+    parser.add_argument('--allow-config-change', action='store_true', help='With --restore, accept a Config.txt that differs from the checkpoint\'s and continue with it - what-if runs from a warmed-up state')
+    parser.add_argument('--profile', action='store_true', help='Attribute every stall cycle to a cause, aggregated per cause, opcode, FU and register (stall_profile.csv)')
     args = parser.parse_args()
+    if (args.checkpoint or args.restore) and (args.timing == "Y" or args.sample):
+        parser.error("checkpoints can not be combined with --timing Y or --sample")
+    if args.sample and args.sample <= args.sample_length + args.sample_warmup:
+        parser.error("--sample must be larger than --sample-length + --sample-warmup")
 
     iodir = os.path.abspath(args.iodir)
     print("IO Directory:", iodir)
 
     # Parse Config
     config = Config(iodir)
-
-    # Parse IMEM
-    imem = IMEM(iodir)  
-    # Parse SMEM
-    sdmem = DMEM("SDMEM", iodir, 13) # 32 KB is 2^15 bytes = 2^13 K 32-bit words.
-    # Parse VMEM
-    vdmem = DMEM("VDMEM", iodir, 17) # 512 KB is 2^19 bytes = 2^17 K 32-bit words. 
+    cache = SimCache(iodir) if args.cache else None
+
+    if args.tracein == "cosim":
+        # Co-simulation - the functional simulator executes the code as the timing model fetches it, no resolved code file
+        import rrm9598_avm6288_funcsimulator as funcsimulator
+        func_imem = funcsimulator.IMEM(iodir, cache)
+        sdmem = funcsimulator.DMEM("SDMEM", iodir, 13, args.memin == "binary", cache)
+        vdmem = funcsimulator.DMEM("VDMEM", iodir, 17, args.memin == "binary", cache)
+        func_core = funcsimulator.Core(func_imem, sdmem, vdmem, verbose=False)
+        imem = StreamIMEM(func_core.execute(), args.window)
+    else:
+        # Parse IMEM
+        imem = IMEM(iodir, args.tracein == "binary", args.window, cache)  
+        # Parse SMEM
+        sdmem = DMEM("SDMEM", iodir, 13, args.memin == "binary", cache) # 32 KB is 2^15 bytes = 2^13 K 32-bit words.
+        # Parse VMEM
+        vdmem = DMEM("VDMEM", iodir, 17, args.memin == "binary", cache) # 512 KB is 2^19 bytes = 2^17 K 32-bit words. 
+
+    # Timing diagram sink, written as instructions retire
+    sink = None
+    if args.timing == "Y":
+        if args.diagram == "chrome":
+            sink = ChromeTraceExporter(os.path.join(iodir, "timing_trace_{}.json".format(config.parameters["computeQueueDepth"])), config)
+        elif args.diagram == "sparse":
+            sink = SparseTimingDiagramExporter(os.path.join(iodir, "timing_diagram_{}_sparse.csv".format(config.parameters["computeQueueDepth"])))
+        else:
+            sink = TimingDiagramExporter(os.path.join(iodir, "timing_diagram_{}.csv".format(config.parameters["computeQueueDepth"])))
 
     # Create Vector Core
-    vcore = Core(imem, sdmem, vdmem, config)
+    sampler = Sampler(args.sample, args.sample_length, args.sample_warmup, args.sample_seed) if args.sample else None
+    vcore = Core(imem, sdmem, vdmem, config, args.engine, sink, args.decode_cache, args.extrapolate, sampler, args.profile)
+    vcore.checkpoints = sorted([(cycle, os.path.join(iodir, "timing_checkpoint_{}.ckpt".format(cycle))) for cycle in args.checkpoint])
+    if args.restore is not None:
+        vcore.restore_checkpoint(args.restore, args.allow_config_change)
 
     # Run Core
     vcore.run()   
     # vcore.dumpregs(iodir)
     
     vcore.dumpResult(iodir)
-    
-    if args.timing == "Y":
-        vcore.dumpTimingDiagram(iodir)
+    if args.profile:
+        vcore.profiler.dump(os.path.join(iodir, "stall_profile.csv"))
+
+    if args.tracein == "cosim":
+        # Functional results, as the functional simulator dumps them
+        func_core.dumpregs(iodir)
+        sdmem.dump()
+        vdmem.dump()
 
     # sdmem.dump()
     # vdmem.dump()
@@ -0,0 +1,230 @@
+# -------------------------------------------------------------
+# Title   : Vector Processor - Resolved Code Trace
+# Authors : Rugved Mhatre (rrm9598), Akshath Mahajan (avm6288)
+# -------------------------------------------------------------
+
+# The functional simulator resolves every dynamic instruction into a line of the form
+#     LV VR1 (0,1,2,...,63)     SS SR1 (12)     B (7)     MTCL SR2 [32]     ADDVV VR1 VR2 VR3
+# and the timing simulator replays them. In memory, a resolved instruction is a record tuple:
+#     (instruction word, operand tokens, memory / branch address, vector length)
+# - operand tokens : tuple of the register and immediate tokens, as written in the code - ("VR1",)
+# - address        : None, an int for a single address, a range for a constant stride access,
+#                    or a tuple of ints for any other access pattern (gathers, zero stride)
+# - vector length  : None, or the value written to the VLR by MTCL
+#
+# Resolved_Code.bin stores the same records in binary:
+#     header : b"VMTR" + format version (uint8)
+#     record : opcode (uint8), flags (uint8), operands, address, vector length
+#     flags  : bits 0-1 number of operands, bits 2-3 address kind, bit 4 vector length present
+#     operand: uint8 - 0x00 | index for SRn, 0x40 | index for VRn, 0x80 followed by an int32 immediate
+#     address: ADDR_SINGLE int32 | ADDR_STRIDED int32 base, int32 stride, uint16 count | ADDR_LIST uint16 count, int32 * count
+# Lines which do not fit this layout are stored as OP_TEXT records - uint16 length followed by the utf-8 line.
+
+import os
+import mmap
+import struct
+
+TRACE_MAGIC = b"VMTR"
+TRACE_VERSION = 1
+
+# Instruction words of the resolved code, TRACE_WORDS[opcode] is the instruction word
+TRACE_WORDS = ["HALT",
+               "ADDVV", "ADDVS", "SUBVV", "SUBVS", "MULVV", "MULVS", "DIVVV", "DIVVS",
+               "SEQVV", "SEQVS", "SNEVV", "SNEVS", "SGTVV", "SGTVS", "SLTVV", "SLTVS", "SGEVV", "SGEVS", "SLEVV", "SLEVS",
+               "CVM", "POP", "MTCL", "MFCL",
+               "LV", "SV", "LVWS", "SVWS", "LVI", "SVI", "LS", "SS",
+               "ADD", "SUB", "AND", "OR", "XOR", "SLL", "SRL", "SRA",
+               "B",
+               "UNPACKLO", "UNPACKHI", "PACKLO", "PACKHI"]
+TRACE_OPCODES = {word: opcode for opcode, word in enumerate(TRACE_WORDS)}
+OP_TEXT = 0xFF
+
+# Address kinds
+ADDR_NONE, ADDR_SINGLE, ADDR_STRIDED, ADDR_LIST = range(4)
+
+# Operand encodings
+OPERAND_SCALAR = 0x00
+OPERAND_VECTOR = 0x40
+OPERAND_IMMEDIATE = 0x80
+REGISTER_PREFIXES = {"SR": OPERAND_SCALAR, "VR": OPERAND_VECTOR}
+# Pre-built register tokens, so decoding a record does not build a new string per operand
+REGISTER_TOKENS = {OPERAND_SCALAR | idx: "SR" + str(idx) for idx in range(OPERAND_VECTOR)}
+REGISTER_TOKENS.update({OPERAND_VECTOR | idx: "VR" + str(idx) for idx in range(OPERAND_VECTOR)})
+
+HEADER = struct.Struct("<4sB")
+RECORD_HEAD = struct.Struct("<BB")
+INT32 = struct.Struct("<i")
+UINT16 = struct.Struct("<H")
+STRIDED = struct.Struct("<iiH")
+
+def pack_addresses(addresses: list):
+    # Compact form of a list of element addresses - int for one address, range for a constant non-zero stride, tuple otherwise
+    if len(addresses) == 1:
+        return addresses[0]
+    if len(addresses) > 1:
+        stride = addresses[1] - addresses[0]
+        if stride != 0 and all(addresses[i + 1] - addresses[i] == stride for i in range(len(addresses) - 1)):
+            return range(addresses[0], addresses[-1] + stride, stride)
+    return tuple(addresses)
+
+def parse_address(token: str):
+    # "(5)" -> 5, "(0,1,2)" -> range(0, 3), "()" -> ()
+    inner = token[1:-1]
+    if inner == "":
+        return ()
+    if "," not in inner:
+        return int(inner)
+    return pack_addresses([int(address) for address in inner.split(",")])
+
+def parse_resolved(line: str):
+    # Resolved code line -> record
+    tokens = line.split(" ")
+    operands = []
+    address = None
+    vector_length = None
+    for token in tokens[1:]:
+        if token.startswith("("):
+            address = parse_address(token)
+        elif token.startswith("["):
+            vector_length = int(token[1:-1])
+        else:
+            operands.append(token)
+    return (tokens[0], tuple(operands), address, vector_length)
+
+def read_resolved(filepath):
+    # Generator over the records of a resolved code text file, skipping comments and blank lines
+    with open(filepath, 'r') as resolved_code_file:
+        for line in resolved_code_file:
+            if not (line.startswith('#') or line.strip() == ''):
+                yield parse_resolved(line.split('#')[0].strip())
+
+def format_address(address):
+    if type(address) is int:
+        return "(" + str(address) + ")"
+    return "(" + ",".join([str(a) for a in address]) + ")"
+
+def format_resolved(record: tuple):
+    # Record -> resolved code line
+    word, operands, address, vector_length = record
+    tokens = [word]
+    tokens.extend(operands)
+    if address is not None:
+        tokens.append(format_address(address))
+    if vector_length is not None:
+        tokens.append("[" + str(vector_length) + "]")
+    return " ".join(tokens)
+
+def encode_operand(token: str):
+    # Returns the encoded operand bytes, or None if the token is neither a register nor an immediate
+    prefix = REGISTER_PREFIXES.get(token[:2])
+    if prefix is not None and token[2:].isdigit() and str(int(token[2:])) == token[2:] and int(token[2:]) < OPERAND_VECTOR:
+        return bytes([prefix | int(token[2:])])
+    if (token.isdigit() or (token[:1] == '-' and token[1:].isdigit())) and str(int(token)) == token:
+        return bytes([OPERAND_IMMEDIATE]) + INT32.pack(int(token))
+    return None
+
+def encode_record(record: tuple, line: str = None):
+    # line - the resolved code line the record was parsed from, if any. Lines which would not be reproduced exactly are kept as text.
+    word, operands, address, vector_length = record
+    opcode = TRACE_OPCODES.get(word)
+    encoded_operands = [encode_operand(token) for token in operands]
+    if opcode is None or len(operands) > 3 or None in encoded_operands or (line is not None and format_resolved(record) != line):
+        return encode_text(line if line is not None else format_resolved(record))
+
+    if address is None:
+        kind, encoded_address = ADDR_NONE, b""
+    elif type(address) is int:
+        kind, encoded_address = ADDR_SINGLE, INT32.pack(address)
+    elif type(address) is range:
+        kind, encoded_address = ADDR_STRIDED, STRIDED.pack(address.start, address.step, len(address))
+    elif len(address) == 0:
+        kind, encoded_address = ADDR_STRIDED, STRIDED.pack(0, 0, 0)
+    else:
+        kind, encoded_address = ADDR_LIST, UINT16.pack(len(address)) + struct.pack("<%di" % len(address), *address)
+
+    flags = len(operands) | (kind << 2) | ((vector_length is not None) << 4)
+    encoded = RECORD_HEAD.pack(opcode, flags) + b"".join(encoded_operands) + encoded_address
+    if vector_length is not None:
+        encoded += INT32.pack(vector_length)
+    return encoded
+
+def encode_text(line: str):
+    text = line.encode("utf-8")
+    return RECORD_HEAD.pack(OP_TEXT, 0) + UINT16.pack(len(text)) + text
+
+def decode_record(buffer, offset: int):
+    # Decodes the record starting at offset, returns (record, offset of the next record)
+    opcode, flags = RECORD_HEAD.unpack_from(buffer, offset)
+    offset += RECORD_HEAD.size
+    if opcode == OP_TEXT:
+        (length,) = UINT16.unpack_from(buffer, offset)
+        offset += UINT16.size
+        return parse_resolved(bytes(buffer[offset:offset + length]).decode("utf-8")), offset + length
+
+    operands = []
+    for _ in range(flags & 0x3):
+        operand = buffer[offset]
+        offset += 1
+        if operand == OPERAND_IMMEDIATE:
+            operands.append(str(INT32.unpack_from(buffer, offset)[0]))
+            offset += INT32.size
+        else:
+            operands.append(REGISTER_TOKENS[operand])
+
+    kind = (flags >> 2) & 0x3
+    if kind == ADDR_NONE:
+        address = None
+    elif kind == ADDR_SINGLE:
+        (address,) = INT32.unpack_from(buffer, offset)
+        offset += INT32.size
+    elif kind == ADDR_STRIDED:
+        base, stride, count = STRIDED.unpack_from(buffer, offset)
+        offset += STRIDED.size
+        address = range(base, base + stride * count, stride) if count else ()
+    else:
+        (count,) = UINT16.unpack_from(buffer, offset)
+        offset += UINT16.size
+        address = struct.unpack_from("<%di" % count, buffer, offset)
+        offset += INT32.size * count
+
+    vector_length = None
+    if flags & 0x10:
+        (vector_length,) = INT32.unpack_from(buffer, offset)
+        offset += INT32.size
+    return (TRACE_WORDS[opcode], tuple(operands), address, vector_length), offset
+
+class TraceWriter(object):
+    # Writes records to a binary trace file
+    def __init__(self, filepath):
+        self.filepath = filepath
+        self.file = open(filepath, 'wb')
+        self.file.write(HEADER.pack(TRACE_MAGIC, TRACE_VERSION))
+
+    def write(self, record: tuple, line: str = None):
+        self.file.write(encode_record(record, line))
+
+    def close(self):
+        self.file.close()
+
+def read_trace(filepath):
+    # Generator over the records of a binary trace file, memory mapped so only the pages being decoded are resident
+    with open(filepath, 'rb') as trace_file:
+        if os.path.getsize(filepath) < HEADER.size:
+            raise ValueError("Not a resolved code trace: " + filepath)
+        with mmap.mmap(trace_file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            magic, version = HEADER.unpack_from(buffer, 0)
+            if magic != TRACE_MAGIC or version != TRACE_VERSION:
+                raise ValueError("Not a resolved code trace (or unsupported version): " + filepath)
+            offset = HEADER.size
+            end = len(buffer)
+            while offset < end:
+                record, offset = decode_record(buffer, offset)
+                yield record
+
+def write_trace(filepath, records):
+    writer = TraceWriter(filepath)
+    try:
+        for record in records:
+            writer.write(record)
+    finally:
+        writer.close()